@@ -0,0 +1,134 @@
+import contextvars
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from Telemetry import span
+
+# Load environment variables
+load_dotenv()
+
+# Per-stage timeouts in seconds and the size of the shared LLM thread pool
+ANALYSIS_LLM_TIMEOUT = float(os.getenv("ANALYSIS_LLM_TIMEOUT", "90"))
+ANALYSIS_THREADS = int(os.getenv("ANALYSIS_THREADS", "16"))
+
+DEFAULT_TIMEOUTS = {
+    "analysis": ANALYSIS_LLM_TIMEOUT,
+    "courses": ANALYSIS_LLM_TIMEOUT,
+}
+
+# Gemini calls are I/O bound, so a thread pool shared by all sessions is enough
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_THREADS, thread_name_prefix="analysis")
+
+
+# Everything the "Analyze Resume" button renders
+@dataclass
+class AnalysisResult:
+    analysis: str = ""
+    course_suggestions: str = ""
+    match_score: float = None
+    ats_score: float = 0
+    skills_match: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+
+def _timed(timings, name, func, *args):
+    start = time.perf_counter()
+    try:
+        with span(f"analysis.{name}"):
+            return func(*args)
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+
+
+# Wait for an LLM stage until its own deadline, turning failures into display text
+def _collect(result, name, future, deadline, fallback):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        future.cancel()
+        result.errors[name] = "timeout"
+        return f"{fallback}: timed out, please try again."
+    except Exception as e:
+        result.errors[name] = str(e)
+        return f"{fallback}: {e}"
+
+
+# Forward the latest streamed text per stage to on_chunk(stage, text) on the calling
+# thread; Streamlit elements cannot be updated from the pool threads
+def _drain_updates(updates, on_chunk, futures, deadline):
+    while True:
+        done = all(future.done() for future in futures)
+        latest = {}
+        try:
+            stage, text = updates.get_nowait() if done else updates.get(timeout=0.05)
+            latest[stage] = text
+            while True:
+                stage, text = updates.get_nowait()
+                latest[stage] = text
+        except queue.Empty:
+            pass
+        # Only the newest text per stage is rendered, so slow reruns skip stale chunks
+        for stage, text in latest.items():
+            on_chunk(stage, text)
+        if done or time.monotonic() >= deadline:
+            return
+
+
+# Run the analysis stages: both Gemini calls concurrently in the thread pool while
+# the local scorers and skill matcher run on the calling thread. With on_chunk, the Gemini
+# responses are streamed and on_chunk(stage, text_so_far) is called as they arrive.
+def run_analysis(resume_text, job_description, analyze=None, suggest=None,
+                 match=None, ats=None, timeouts=None, on_chunk=None, skills=None):
+    if analyze is None or suggest is None or match is None or ats is None:
+        from ResumeAnalyzer import analyze_resume, suggest_courses, calculate_match_score, calculate_ats_score
+        analyze = analyze or analyze_resume
+        suggest = suggest or suggest_courses
+        match = match or calculate_match_score
+        ats = ats or calculate_ats_score
+    if skills is None:
+        from SkillMatcher import skill_match as skills
+    timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+    result = AnalysisResult()
+    started = time.monotonic()
+    updates = queue.Queue() if on_chunk else None
+
+    def stage_call(stage, func, *args):
+        if updates is None:
+            return func(*args)
+        return func(*args, on_chunk=lambda piece, text: updates.put((stage, text)))
+
+    # Pool threads run in a copy of the caller's context so their spans join its trace
+    analysis_future = _executor.submit(contextvars.copy_context().run, _timed, result.timings, "analysis",
+                                       stage_call, "analysis", analyze, resume_text, job_description)
+    courses_future = _executor.submit(contextvars.copy_context().run, _timed, result.timings, "courses",
+                                      stage_call, "courses", suggest, resume_text)
+
+    # Local scorers are fast and cannot be preempted, so they only record their duration
+    try:
+        result.match_score = _timed(result.timings, "match_score", match, resume_text, job_description)
+    except Exception as e:
+        result.errors["match_score"] = str(e)
+    try:
+        result.ats_score = _timed(result.timings, "ats_score", ats, resume_text, job_description)
+    except Exception as e:
+        result.errors["ats_score"] = str(e)
+    try:
+        result.skills_match = _timed(result.timings, "skills_match", skills, resume_text, job_description)
+    except Exception as e:
+        result.errors["skills_match"] = str(e)
+
+    if updates is not None:
+        _drain_updates(updates, on_chunk, [analysis_future, courses_future],
+                       started + max(timeouts["analysis"], timeouts["courses"]))
+
+    result.analysis = _collect(result, "analysis", analysis_future,
+                               started + timeouts["analysis"], "AI analysis failed")
+    result.course_suggestions = _collect(result, "courses", courses_future,
+                                         started + timeouts["courses"], "Course suggestions failed")
+    result.timings["total"] = round(time.monotonic() - started, 4)
+    return result
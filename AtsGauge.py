@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+# SVG version of the plot_ats_score donut gauge. It uses the same colours, ring and
+# text layout as the matplotlib figure, with no plotting library involved. Markup is
+# memoized per (integer score, colour band), so only about a hundred variants exist.
+
+BACKGROUND = "#1E1E1E"
+TRACK = "#333333"
+BAND_COLORS = {
+    "high": "#4CAF50",    # Green for high scores
+    "medium": "#FFA500",  # Orange for medium scores
+    "low": "#FF4444",     # Red for low scores
+}
+
+# Geometry in the figure's data units: ring from r=0.7 to r=1.0 on a 8x5 in canvas
+_RADIUS = 0.85
+_RING_WIDTH = 0.3
+_CIRCUMFERENCE = 2 * 3.141592653589793 * _RADIUS
+
+
+# Colour band for a score, using the thresholds of plot_ats_score
+def score_band(ats_score):
+    if ats_score >= 80:
+        return "high"
+    if ats_score >= 60:
+        return "medium"
+    return "low"
+
+
+@lru_cache(maxsize=None)
+def _gauge_svg(score, band):
+    filled = _CIRCUMFERENCE * score / 100
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="-2.5 -1.56 5 3.12" width="100%" role="img" aria-label="ATS parse rate {score}%" style="background:{BACKGROUND};max-width:640px;display:block;margin:auto" font-family="DejaVu Sans, Verdana, sans-serif">
+<circle r="{_RADIUS}" fill="none" stroke="{TRACK}" stroke-width="{_RING_WIDTH}"/>
+<circle r="{_RADIUS}" fill="none" stroke="{BAND_COLORS[band]}" stroke-opacity="0.9" stroke-width="{_RING_WIDTH}" stroke-dasharray="{filled:.4f} {_CIRCUMFERENCE:.4f}" transform="rotate(-90)"/>
+<text y="-0.1" text-anchor="middle" dominant-baseline="central" fill="white" font-size="0.26" font-weight="bold">{score}</text>
+<text y="0.1" text-anchor="middle" dominant-baseline="central" fill="white" font-size="0.17">%</text>
+<text y="0.3" text-anchor="middle" fill="#888888" font-size="0.1">ATS Parse Rate</text>
+</svg>"""
+
+
+# Gauge markup for a score; the number and ring show the whole percentage, as the
+# figure's label always did
+def ats_gauge_svg(ats_score):
+    score = min(100, max(0, int(ats_score or 0)))
+    return _gauge_svg(score, score_band(ats_score or 0))
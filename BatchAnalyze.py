@@ -0,0 +1,322 @@
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+# Headless bulk screening: score a directory (or globs) of resume PDFs against one or
+# more job descriptions without Streamlit.
+#
+#   python BatchAnalyze.py resumes/ --jd backend.txt --jd data.pdf --output results.jsonl
+#   python BatchAnalyze.py "inbox/*.pdf" --jd role.txt --output results.csv --llm --resume
+#
+# Extraction and the local scores run in a process pool; with --llm the Gemini stages
+# run in a bounded thread pool in the batch priority lane. Each resume is one JSONL
+# line or CSV row, written as soon as it is finished, so the output doubles as the
+# checkpoint: --resume skips resumes already in it (dropping a torn last line) unless
+# their Gemini stages failed, and refuses a file written for other job descriptions.
+
+# Load environment variables
+load_dotenv()
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+# Resumes per task sent to a worker process
+BATCH_CHUNK_SIZE = 16
+# Start of the error of a row whose Gemini stages failed (retried by --resume)
+LLM_ERROR = "LLM stages failed:"
+
+_job_descriptions = None
+
+
+# Resume PDFs from directories (searched recursively) and globs, in a stable order
+def find_resumes(inputs):
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.pdf"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        paths.extend(path for path in matches if path.lower().endswith(".pdf"))
+    return sorted(set(paths))
+
+
+# Job descriptions as (name, text): .pdf files are extracted, anything else read as text
+def load_job_descriptions(paths):
+    from ResumeAnalyzer import extract_text_from_pdf
+
+    jobs = []
+    for name, path in zip(job_names(paths), paths):
+        if path.lower().endswith(".pdf"):
+            text = extract_text_from_pdf(path, workers=1)
+        else:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        jobs.append((name, text))
+    return jobs
+
+
+# Unique column names for the job descriptions: the file name, or the relative path
+# when two files share a name, with " (2)", " (3)" ... if a path is given twice
+def job_names(paths):
+    basenames = [os.path.basename(path) for path in paths]
+    names = []
+    seen = set()
+    for path, base in zip(paths, basenames):
+        name = base if basenames.count(base) == 1 else os.path.relpath(path)
+        unique, n = name, 1
+        while unique in seen:
+            n += 1
+            unique = f"{name} ({n})"
+        seen.add(unique)
+        names.append(unique)
+    return names
+
+
+def _init_worker(job_descriptions):
+    global _job_descriptions
+    _job_descriptions = job_descriptions
+
+
+# Worker task: extract and score a chunk of resumes against every job description
+def _score_chunk(paths, keep_text, job_descriptions=None):
+    from ResumeAnalyzer import calculate_ats_score, calculate_match_score, extract_text_from_pdf
+
+    job_descriptions = job_descriptions or _job_descriptions
+    rows = []
+    for path in paths:
+        row = {"resume": path, "status": "ok", "chars": 0, "jobs": [], "error": ""}
+        try:
+            statuses = []
+            text = extract_text_from_pdf(path, workers=1, on_status=statuses.append)
+            row["status"] = statuses[-1] if statuses else "ok"
+            row["chars"] = len(text)
+            for name, job_text in job_descriptions:
+                row["jobs"].append({
+                    "job_description": name,
+                    "ats_score": calculate_ats_score(text, job_text),
+                    "match_score": calculate_match_score(text, job_text, observe=False),
+                })
+            if keep_text:
+                row["text"] = text
+        except Exception as e:
+            row["status"] = "error"
+            row["error"] = str(e)
+        rows.append(row)
+    return rows
+
+
+# Gemini stages for one scored resume: an analysis per job description and course suggestions
+def _run_llm_stages(row, job_descriptions):
+    from LLMScheduler import PRIORITY_BATCH
+    from ResumeAnalyzer import analyze_resume, suggest_courses
+
+    text = row.pop("text", "")
+    if not text:
+        return row
+    try:
+        for job, (_, job_text) in zip(row["jobs"], job_descriptions):
+            job["analysis"] = analyze_resume(text, job_text, priority=PRIORITY_BATCH)
+        row["course_suggestions"] = suggest_courses(text, priority=PRIORITY_BATCH)
+    except Exception as e:
+        row["error"] = f"{LLM_ERROR} {e}"
+    return row
+
+
+# Appends result rows to a JSONL or CSV file; on resume, reads back the resumes
+# already done and cuts off a partially written last row. Resumes whose Gemini
+# stages failed are not done: they run again and their new row follows the old one.
+class ResultWriter:
+    def __init__(self, path, job_names, with_llm=False, resume=False):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        # JSONL rows carry the run's settings, which the CSV header records
+        self.settings = {"job_descriptions": list(job_names), "llm": bool(with_llm)}
+        self.fields = ["resume", "status", "chars", "error"]
+        for name in job_names:
+            self.fields += [f"ats_score[{name}]", f"match_score[{name}]"]
+            if with_llm:
+                self.fields.append(f"analysis[{name}]")
+        if with_llm:
+            self.fields.append("course_suggestions")
+        self.done = self._recover() if resume else set()
+        is_new = not self.done or not os.path.exists(path)
+        self._file = open(path, "a" if self.done else "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._file, self.fields) if self.format == "csv" else None
+        if self._csv is not None and is_new:
+            self._csv.writeheader()
+        self.written = 0
+
+    def _recover(self):
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, "rb") as f:
+            data = f.read()
+        consumed = 0
+
+        # Decoded lines, tracking how many bytes have been read (CSV rows may span lines)
+        def lines():
+            nonlocal consumed
+            for raw in data.splitlines(keepends=True):
+                consumed += len(raw)
+                yield raw.decode("utf-8", errors="replace")
+
+        done = set()
+        good_end = 0
+        if self.format == "csv":
+            reader = csv.reader(lines())
+            header = next(reader, None)
+            if header is not None:
+                if header != self.fields:
+                    raise ValueError(f"{self.path} was written for other job descriptions or options")
+                good_end = consumed
+            for values in reader:
+                # A row without its line ending, or with missing fields, was cut off
+                if data[consumed - 1:consumed] != b"\n" or len(values) != len(self.fields):
+                    break
+                if not values[3].startswith(LLM_ERROR):
+                    done.add(values[0])
+                good_end = consumed
+        else:
+            for line in lines():
+                try:
+                    if not line.endswith("\n"):
+                        raise ValueError("torn line")
+                    row = json.loads(line)
+                    resume, error = row["resume"], row.get("error") or ""
+                    settings = {key: row.get(key) for key in self.settings}
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    break
+                if settings != self.settings:
+                    raise ValueError(f"{self.path} was written for other job descriptions or options")
+                if not error.startswith(LLM_ERROR):
+                    done.add(resume)
+                good_end = consumed
+        with open(self.path, "r+b") as f:
+            f.truncate(good_end)
+        return done
+
+    def write(self, row):
+        if self._csv is not None:
+            flat = {"resume": row["resume"], "status": row["status"], "chars": row["chars"], "error": row["error"]}
+            for job in row["jobs"]:
+                name = job["job_description"]
+                flat[f"ats_score[{name}]"] = job["ats_score"]
+                flat[f"match_score[{name}]"] = job["match_score"]
+                if "analysis" in job:
+                    flat[f"analysis[{name}]"] = job["analysis"]
+            if "course_suggestions" in row:
+                flat["course_suggestions"] = row["course_suggestions"]
+            self._csv.writerow(flat)
+        else:
+            self._file.write(json.dumps({**row, **self.settings}, ensure_ascii=False) + "\n")
+        # One flush per resume keeps a crash to at most one torn row
+        self._file.flush()
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# Score every resume and stream rows to the writer; returns throughput stats
+def run_batch(resume_paths, job_descriptions, writer, workers=None, with_llm=False,
+              llm_concurrency=BATCH_LLM_CONCURRENCY, chunk_size=BATCH_CHUNK_SIZE, progress=None):
+    workers = workers or BATCH_WORKERS or os.cpu_count() or 1
+    todo = [path for path in resume_paths if path not in writer.done]
+    started = time.perf_counter()
+    llm_pool = ThreadPoolExecutor(max_workers=max(1, llm_concurrency), thread_name_prefix="batch-llm") if with_llm else None
+    llm_pending = set()
+
+    def finish(rows):
+        for row in rows:
+            if llm_pool is not None and "text" in row:
+                # Bound the resumes waiting on Gemini so memory stays flat
+                while len(llm_pending) >= llm_concurrency * 4:
+                    write_done(wait(llm_pending, return_when=FIRST_COMPLETED)[0])
+                llm_pending.add(llm_pool.submit(_run_llm_stages, row, job_descriptions))
+            else:
+                row.pop("text", None)
+                writer.write(row)
+        if progress:
+            progress(writer.written, len(todo))
+
+    def write_done(done):
+        for future in done:
+            llm_pending.discard(future)
+            writer.write(future.result())
+
+    try:
+        if workers <= 1:
+            for chunk in _chunks(todo, chunk_size):
+                finish(_score_chunk(chunk, with_llm, job_descriptions))
+                write_done([future for future in list(llm_pending) if future.done()])
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(job_descriptions,)) as pool:
+                pending = set()
+                for chunk in _chunks(todo, chunk_size):
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future.result())
+                        write_done([future for future in list(llm_pending) if future.done()])
+                    pending.add(pool.submit(_score_chunk, chunk, with_llm))
+                for future in pending:
+                    finish(future.result())
+        if llm_pending:
+            write_done(wait(llm_pending)[0])
+    finally:
+        if llm_pool is not None:
+            llm_pool.shutdown(wait=True)
+
+    seconds = time.perf_counter() - started
+    return {
+        "resumes": len(todo),
+        "skipped": len(resume_paths) - len(todo),
+        "seconds": round(seconds, 3),
+        "resumes_per_minute": round(len(todo) * 60 / seconds, 1) if seconds else None,
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory of resume PDFs against job descriptions")
+    parser.add_argument("inputs", nargs="+", help="directories or globs of resume PDFs")
+    parser.add_argument("--jd", action="append", required=True, help="job description file (.txt or .pdf), repeatable")
+    parser.add_argument("--output", required=True, help="results file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--llm", action="store_true", help="also run the Gemini analysis and course suggestions")
+    parser.add_argument("--llm-concurrency", type=int, default=BATCH_LLM_CONCURRENCY)
+    parser.add_argument("--resume", action="store_true", help="continue a previous run, skipping finished resumes")
+    args = parser.parse_args()
+
+    resumes = find_resumes(args.inputs)
+    job_descriptions = load_job_descriptions(args.jd)
+    writer = ResultWriter(args.output, [name for name, _ in job_descriptions], args.llm, args.resume)
+
+    def progress(written, total):
+        print(f"\r{written}/{total} resumes", end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = run_batch(resumes, job_descriptions, writer, args.workers or None, args.llm,
+                          args.llm_concurrency, progress=progress)
+    finally:
+        writer.close()
+    print(file=sys.stderr)
+    print(f"Analyzed {stats['resumes']} resumes ({stats['skipped']} already done) in {stats['seconds']} s: "
+          f"{stats['resumes_per_minute']} resumes/min with {stats['workers']} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from TextPipeline import analyze_text
+
+
+# Unique lowercase words of a document, from the shared tokenization
+def _word_set(text):
+    return analyze_text(text).word_set if text else frozenset()
+
+
+# ATS keyword-coverage scores for every (resume, job description) pair
+class AtsBatchResult:
+    def __init__(self, scores, resume_words, job_words, job_present):
+        self.scores = scores
+        self._resume_words = resume_words
+        self._job_words = job_words
+        self._job_present = job_present
+
+    @property
+    def shape(self):
+        return self.scores.shape
+
+    def score(self, i, j):
+        """Score of resume i against job description j, as calculate_ats_score returns it"""
+        return float(self.scores[i, j])
+
+    def keywords(self, i, j):
+        """Return (matched, missing) job keywords for resume i against job description j"""
+        if not self._job_present[j]:
+            return [], []
+        job_words = self._job_words[j]
+        matched = job_words & self._resume_words[i]
+        return sorted(matched), sorted(job_words - matched)
+
+    def to_records(self, include_keywords=True):
+        """Flatten the matrix into one dict per pair"""
+        records = []
+        n_resumes, n_jobs = self.scores.shape
+        for i in range(n_resumes):
+            for j in range(n_jobs):
+                record = {"resume": i, "job_description": j, "ats_score": self.score(i, j)}
+                if include_keywords:
+                    record["matched"], record["missing"] = self.keywords(i, j)
+                records.append(record)
+        return records
+
+
+# Score N resumes against M job descriptions in one pass. Each document is tokenized
+# once into a shared vocabulary; keyword overlaps for all pairs come from one sparse
+# product of the binary document-term matrices. Scores match calculate_ats_score exactly.
+def batch_ats_scores(resumes, job_descriptions):
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    vocabulary = {}
+
+    def binary_rows(word_sets):
+        indptr = [0]
+        indices = []
+        for words in word_sets:
+            indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+            indptr.append(len(indices))
+        return indptr, indices
+
+    resume_words = [_word_set(text) for text in resumes]
+    job_words = [_word_set(text) for text in job_descriptions]
+    job_present = [bool(text) for text in job_descriptions]
+
+    resume_rows = binary_rows(resume_words)
+    job_rows = binary_rows(job_words)
+    n_terms = max(1, len(vocabulary))
+
+    def to_matrix(rows, n_docs):
+        indptr, indices = rows
+        data = np.ones(len(indices), dtype=np.int32)
+        return csr_matrix((data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+                          shape=(n_docs, n_terms))
+
+    resume_matrix = to_matrix(resume_rows, len(resume_words))
+    job_matrix = to_matrix(job_rows, len(job_words))
+
+    overlap = (resume_matrix @ job_matrix.T).toarray().astype(np.float64)
+    job_sizes = np.array([len(words) for words in job_words], dtype=np.float64)
+    valid = (job_sizes > 0) & np.array(job_present, dtype=bool)
+
+    raw = np.zeros_like(overlap)
+    np.divide(overlap, job_sizes, out=raw, where=valid[np.newaxis, :])
+    raw *= 100
+
+    # Python's round() and np.round() disagree on some halfway cases; use round() for parity
+    scores = np.array([[round(value, 2) for value in row] for row in raw.tolist()], dtype=np.float64)
+    scores = scores.reshape(len(resume_words), len(job_words))
+    return AtsBatchResult(scores, resume_words, job_words, job_present)
+
+
+# One resume against many job descriptions
+def score_resume_against_jobs(resume_text, job_descriptions):
+    return batch_ats_scores([resume_text], job_descriptions)
+
+
+# Many resumes against one job description
+def score_resumes_against_job(resumes, job_description):
+    return batch_ats_scores(resumes, [job_description])
@@ -0,0 +1,124 @@
+import os
+from collections import deque
+from dotenv import load_dotenv
+from TextPipeline import estimate_tokens
+
+# Load environment variables
+load_dotenv()
+
+# Bounded chat history for the career assistant. Recent turns are sent to the model
+# verbatim while they fit CHAT_TOKEN_BUDGET; turns that fall out of that window are
+# folded into a short running summary capped at CHAT_SUMMARY_TOKENS. At most
+# CHAT_MAX_MESSAGES messages are kept for display, so a session's memory stays flat
+# however long the chat gets.
+CHAT_TOKEN_BUDGET = int(os.getenv("CHAT_TOKEN_BUDGET", "1500"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "300"))
+CHAT_MAX_MESSAGES = int(os.getenv("CHAT_MAX_MESSAGES", "60"))
+# Messages rendered in the sidebar by default, and how many more each "earlier" click shows
+CHAT_RENDER_LAST = int(os.getenv("CHAT_RENDER_LAST", "6"))
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "10"))
+
+# Words of each folded message kept in the summary
+_SUMMARY_WORDS = 24
+
+_SPEAKERS = {"user": "User", "bot": "Assistant"}
+
+
+class ChatMessage:
+    __slots__ = ("seq", "role", "text", "tokens")
+
+    def __init__(self, seq, role, text):
+        self.seq = seq
+        self.role = role
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+# One summary line per folded message: the speaker and the opening words
+def summarize_message(role, text, max_words=_SUMMARY_WORDS):
+    words = text.split()
+    snippet = " ".join(words[:max_words]) + (" …" if len(words) > max_words else "")
+    return f"{_SPEAKERS.get(role, role)}: {snippet}"
+
+
+class Conversation:
+    def __init__(self, token_budget=CHAT_TOKEN_BUDGET, summary_tokens=CHAT_SUMMARY_TOKENS,
+                 max_messages=CHAT_MAX_MESSAGES, summarize=summarize_message):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.summarize = summarize
+        self.messages = deque(maxlen=max(2, max_messages))
+        self.summary = deque()
+        self._summary_size = 0
+        self._next_seq = 0
+        self._folded_seq = 0  # messages with a lower seq are part of the summary
+
+    def __len__(self):
+        return len(self.messages)
+
+    @property
+    def total(self):
+        """Messages added since the conversation started or was cleared"""
+        return self._next_seq
+
+    @property
+    def dropped(self):
+        """Earlier messages no longer kept verbatim (only in the summary)"""
+        return self._next_seq - len(self.messages)
+
+    def add(self, role, text):
+        """Append a message ("user" or "bot") and fold turns that left the token window"""
+        if len(self.messages) == self.messages.maxlen:
+            self._fold(self.messages[0].seq + 1)
+        self.messages.append(ChatMessage(self._next_seq, role, text))
+        self._next_seq += 1
+        window = self.window()
+        self._fold(window[0].seq if window else self._next_seq)
+
+    # The newest messages that fit the token budget (always at least the latest one)
+    def window(self):
+        selected = []
+        used = 0
+        for message in reversed(self.messages):
+            if selected and used + message.tokens > self.token_budget:
+                break
+            selected.append(message)
+            used += message.tokens
+        selected.reverse()
+        return selected
+
+    def _fold(self, upto_seq):
+        for message in self.messages:
+            if message.seq >= upto_seq:
+                break
+            if message.seq < self._folded_seq:
+                continue
+            line = self.summarize(message.role, message.text)
+            self.summary.append(line)
+            self._summary_size += estimate_tokens(line)
+        self._folded_seq = max(self._folded_seq, upto_seq)
+        # Keep the memory compact: the oldest summary lines go first
+        while self.summary and self._summary_size > self.summary_tokens:
+            self._summary_size -= estimate_tokens(self.summary.popleft())
+
+    def recent(self, count):
+        """The last count retained messages, oldest first, for display"""
+        if count >= len(self.messages):
+            return list(self.messages)
+        return list(self.messages)[-count:]
+
+    def build_prompt(self, context):
+        """Prompt with the summary memory and the recent turns, ending with the assistant's cue"""
+        parts = [context]
+        if self.summary:
+            parts.append("Summary of the earlier conversation:\n" + "\n".join(self.summary))
+        turns = "\n".join(f"{_SPEAKERS.get(m.role, m.role)}: {m.text}" for m in self.window())
+        parts.append(f"{turns}\nAssistant:")
+        return "\n\n".join(parts)
+
+    def clear(self):
+        self.messages.clear()
+        self.summary.clear()
+        self._summary_size = 0
+        self._next_seq = 0
+        self._folded_seq = 0
@@ -0,0 +1,78 @@
+import random
+import time
+
+
+# Local stand-in for genai.GenerativeModel used by tests and benchmarks.
+# It answers with a canned or prompt-derived reply, optionally split into
+# chunks with artificial latency, and can fail part-way through a stream.
+# Requests can also be rejected up front like an overloaded backend: the
+# first fail_first calls, then a random error_rate share of calls.
+class FakeApiError(Exception):
+    def __init__(self, code=429, message="Resource has been exhausted (e.g. check quota)."):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    def __init__(self, chunks, chunk_delay=0.0, fail_after=None, error=None):
+        self._chunks = chunks
+        self._chunk_delay = chunk_delay
+        self._fail_after = fail_after
+        self._error = error
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    def __iter__(self):
+        for i, chunk in enumerate(self._chunks):
+            if self._fail_after is not None and i >= self._fail_after:
+                raise self._error or RuntimeError("stream interrupted")
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield FakeChunk(chunk)
+
+
+class FakeModel:
+    def __init__(self, model_name="fake-gemini", reply=None, latency=0.0, chunk_size=40,
+                 chunk_delay=0.0, fail_after=None, error=None, fail_first=0, error_rate=0.0,
+                 error_code=429, seed=None):
+        self.model_name = model_name
+        self.reply = reply
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.fail_after = fail_after
+        self.error = error
+        self.fail_first = fail_first
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.rejected = 0
+
+    def _reply_for(self, prompt):
+        if self.reply is not None:
+            return self.reply(prompt) if callable(self.reply) else self.reply
+        words = prompt.split()
+        return f"[{self.model_name}] Reviewed {len(words)} words: " + " ".join(words[-40:])
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.calls <= self.fail_first or (self.error_rate and self.rng.random() < self.error_rate):
+            self.rejected += 1
+            raise FakeApiError(self.error_code)
+        text = self._reply_for(prompt)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        if not stream:
+            if self.fail_after is not None:
+                raise self.error or RuntimeError("request failed")
+            return FakeResponse(chunks)
+        return FakeResponse(chunks, self.chunk_delay, self.fail_after, self.error)
@@ -0,0 +1,78 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# GEMINI_BACKEND=fake serves every model from FakeGemini (for tests and benchmarks)
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini").lower()
+GEMINI_FAKE_LATENCY = float(os.getenv("GEMINI_FAKE_LATENCY", "0"))
+# Share of fake requests rejected with a 429, to exercise retries and the circuit breaker
+GEMINI_FAKE_ERROR_RATE = float(os.getenv("GEMINI_FAKE_ERROR_RATE", "0"))
+
+_lock = threading.RLock()
+_configured = False
+_models = {}
+_model_factory = None
+
+
+# Configure the Gemini SDK once per process. Re-running genai.configure drops the
+# SDK's cached API clients, so request paths must never call it themselves.
+def configure(api_key=None):
+    """Return True when the SDK is configured (or a stand-in backend is active)"""
+    global _configured
+    if _model_factory is not None or GEMINI_BACKEND == "fake":
+        return True
+    with _lock:
+        if not _configured:
+            api_key = api_key or GOOGLE_API_KEY
+            if not api_key:
+                return False
+            import google.generativeai as genai
+
+            genai.configure(api_key=api_key)
+            _configured = True
+    return True
+
+
+def _default_factory(model_name):
+    if GEMINI_BACKEND == "fake":
+        from FakeGemini import FakeModel
+
+        return FakeModel(model_name, latency=GEMINI_FAKE_LATENCY, error_rate=GEMINI_FAKE_ERROR_RATE)
+    import google.generativeai as genai
+
+    configure()
+    return genai.GenerativeModel(model_name)
+
+
+# Reusable model handle by name; handles share the SDK's underlying client connection
+def get_model(model_name):
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            model = _models.get(model_name)
+            if model is None:
+                factory = _model_factory or _default_factory
+                model = factory(model_name)
+                _models[model_name] = model
+    return model
+
+
+# Swap in a local stand-in: factory(model_name) returns an object with generate_content.
+# Pass None to restore the real SDK. Returns the previous factory.
+def set_model_factory(factory):
+    global _model_factory
+    with _lock:
+        previous = _model_factory
+        _model_factory = factory
+        _models.clear()
+    return previous
+
+
+def reset():
+    """Forget cached model handles (the SDK configuration is kept)"""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import dataclass
+from LLMCache import cache_key, llm_cache
+from LLMScheduler import llm_scheduler, PRIORITY_ANALYSIS
+from SingleFlight import FlightAbandoned, SingleFlight
+from Telemetry import span
+from TextPipeline import estimate_tokens
+
+# Identical Gemini calls in flight at the same time share one request
+llm_flights = SingleFlight()
+
+
+# Text produced by one Gemini call; complete is False when a stream was cut off
+@dataclass
+class GenerationResult:
+    text: str
+    complete: bool = True
+    error: Exception = None
+    cached: bool = False
+
+
+# Text of a response or stream chunk; chunks without parts (e.g. the final
+# safety/finish chunk) raise ValueError on .text in the Gemini SDK
+def chunk_text(chunk):
+    try:
+        return chunk.text or ""
+    except (ValueError, AttributeError):
+        return ""
+
+
+# Stream a response, calling on_chunk(piece, text_so_far) as chunks arrive
+def stream_text(model, prompt, on_chunk):
+    parts = []
+    response = model.generate_content(prompt, stream=True)
+    try:
+        for chunk in response:
+            piece = chunk_text(chunk)
+            if piece:
+                parts.append(piece)
+                on_chunk(piece, "".join(parts))
+    except Exception as e:
+        # Errors before any text arrived are reported like a failed blocking call
+        if not parts:
+            raise
+        return GenerationResult("".join(parts), complete=False, error=e)
+    return GenerationResult("".join(parts))
+
+
+# Call Gemini through the shared scheduler (rate limits, retries, circuit breaker)
+def _call_model(model, model_name, prompt, on_chunk, priority):
+    if on_chunk is None:
+        return llm_scheduler.run(model_name, lambda: GenerationResult(model.generate_content(prompt).text), priority)
+    return llm_scheduler.run(model_name, lambda: stream_text(model, prompt, on_chunk), priority)
+
+
+# Run a prompt, streaming into on_chunk when given and blocking otherwise.
+# Complete responses are cached per model and normalized prompt unless use_cache
+# is False or the cache is bypassed globally. On a cache miss, a call identical to
+# one already in flight (from any session) waits for that call's response instead
+# of sending the prompt again. Calls run in the given scheduler priority lane.
+def generate_text(model, prompt, on_chunk=None, use_cache=True, priority=PRIORITY_ANALYSIS):
+    model_name = getattr(model, "model_name", type(model).__name__)
+    use_cache = use_cache and not llm_cache.bypass
+    with span("llm.generate", model=model_name, prompt_chars=len(prompt),
+              prompt_tokens=estimate_tokens(prompt)) as record:
+        if use_cache:
+            cached_text = llm_cache.get(model_name, prompt)
+            if cached_text is not None:
+                record.set(cache="hit", response_chars=len(cached_text))
+                if on_chunk is not None:
+                    on_chunk(cached_text, cached_text)
+                return GenerationResult(cached_text, cached=True)
+            record.set(cache="miss")
+        else:
+            record.set(cache="bypass")
+            llm_cache.record_bypass()
+
+        if use_cache:
+            result, shared = llm_flights.do(
+                cache_key(model_name, prompt),
+                lambda relay: _cache_response(model_name, prompt, _call_model(model, model_name, prompt, relay, priority)),
+                on_chunk,
+            )
+            if shared:
+                record.set(cache="coalesced")
+                # A blocking leader relays nothing, so make sure the final text is shown
+                if on_chunk is not None:
+                    on_chunk(result.text, result.text)
+        else:
+            result = _call_model(model, model_name, prompt, on_chunk, priority)
+
+        record.set(response_chars=len(result.text))
+        if not result.complete:
+            record.fail(f"stream interrupted: {result.error}")
+        return result
+
+
+# Interrupted or empty responses are shown but never cached
+def _cache_response(model_name, prompt, result):
+    if result.complete and result.text:
+        llm_cache.put(model_name, prompt, result.text)
+    return result
+
+
+# generate_text for asyncio code. Awaiting a call that is already in flight does not
+# hold a thread; a new call runs generate_text in the loop's default executor.
+async def generate_text_async(model, prompt, use_cache=True, priority=PRIORITY_ANALYSIS):
+    model_name = getattr(model, "model_name", type(model).__name__)
+    if use_cache and not llm_cache.bypass:
+        future = llm_flights.in_flight(cache_key(model_name, prompt))
+        if future is not None:
+            with span("llm.generate", model=model_name, prompt_chars=len(prompt), cache="coalesced") as record:
+                try:
+                    result = await asyncio.wrap_future(future)
+                except FlightAbandoned:
+                    # The leading session stopped before answering; make the call here instead
+                    record.set(cache="abandoned")
+                else:
+                    record.set(response_chars=len(result.text))
+                    return result
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, generate_text, model, prompt, None, use_cache, priority)
+
+
+# Final display text, noting when a streamed response was interrupted
+def display_text(result):
+    text = result.text.strip()
+    if not result.complete:
+        text += f"\n\n_(Response was interrupted: {result.error})_"
+    return text
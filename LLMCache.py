@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Response cache configuration
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+# Evict at most every this many writes so puts stay cheap
+_EVICT_EVERY = 50
+
+
+# Collapse whitespace so reflowed but otherwise identical prompts share an entry
+def normalize_prompt(prompt):
+    return " ".join(prompt.split())
+
+
+# Cache key: model name plus a hash of the normalized prompt
+def cache_key(model_name, prompt):
+    digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+# SQLite-backed Gemini response cache with a TTL and size-bounded LRU eviction.
+# WAL mode lets every session and worker process share one database file.
+class LLMResponseCache:
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES,
+                 bypass=LLM_CACHE_BYPASS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._schema_ready = True
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_bypass(self):
+        """Count a call that skipped the cache"""
+        self._count("bypassed")
+
+    def get(self, model_name, prompt):
+        """Return the cached response text, or None on a miss or expired entry"""
+        key = cache_key(model_name, prompt)
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def put(self, model_name, prompt, text):
+        """Store a complete response and evict expired or least recently used entries"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key(model_name, prompt), model_name, text, now, now),
+            )
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % _EVICT_EVERY == 1
+            if evict:
+                self.evict(now)
+        except sqlite3.Error:
+            self._count("errors")
+
+    def evict(self, now=None):
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self):
+        """Return hit-rate counters for this process plus the shared entry count"""
+        try:
+            entries, total_hits = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM responses").fetchone()
+        except sqlite3.Error:
+            entries, total_hits = None, None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "total_hits": total_hits,
+                "bypass": self.bypass,
+            }
+
+    def clear(self):
+        """Remove every cached response"""
+        self._connect().execute("DELETE FROM responses")
+
+
+# Process-wide cache shared by every Streamlit session
+llm_cache = LLMResponseCache()
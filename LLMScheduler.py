@@ -0,0 +1,312 @@
+import math
+import os
+import random
+import threading
+import time
+from dotenv import load_dotenv
+from Telemetry import annotate
+
+# Every Gemini call from every session goes through one scheduler per process:
+# - a token bucket per model keeps requests under the model's per-minute quota
+# - at most LLM_MAX_IN_FLIGHT calls (including open streams) run at once
+# - waiting calls are admitted by priority, so chat replies overtake full analyses
+# - rate-limit and server errors are retried with jittered exponential backoff
+# - a circuit breaker per model fails fast while Gemini keeps failing
+
+# Load environment variables
+load_dotenv()
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+# Requests per minute: LLM_DEFAULT_RPM for any model, LLM_RATE_LIMITS overrides per
+# model as "gemini-1.5-flash=15,gemini-1.5-pro=2" (0 means unlimited)
+LLM_DEFAULT_RPM = float(os.getenv("LLM_DEFAULT_RPM", "60"))
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+# Consecutive failures that open a model's circuit, and how long it stays open
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+# Longest a call waits for a slot before giving up
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))
+
+# Priority lanes, lowest value first
+PRIORITY_CHAT = 0
+PRIORITY_ANALYSIS = 1
+PRIORITY_BATCH = 2
+
+# HTTP status codes and google.api_core exception names worth retrying
+_RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "RetryError"}
+
+
+class LLMUnavailableError(RuntimeError):
+    """Gemini could not be called right now; retry_after is a hint in seconds"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class QueueTimeoutError(LLMUnavailableError):
+    pass
+
+
+# The Gemini SDK reports "models/gemini-1.5-flash" for the model configured as
+# "gemini-1.5-flash"; limits and breakers are keyed on the short name
+def model_key(model_name):
+    model_name = str(model_name).strip()
+    return model_name[len("models/"):] if model_name.startswith("models/") else model_name
+
+
+def parse_rate_limits(spec):
+    """Parse "model=rpm,model=rpm" into a dict"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            model_name, rpm = item.split("=", 1)
+            limits[model_key(model_name)] = float(rpm)
+    return limits
+
+
+def is_retryable(error):
+    """True for rate limiting, timeouts and server-side errors"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in _RETRYABLE_CODES:
+        return True
+    return any(cls.__name__ in _RETRYABLE_NAMES for cls in type(error).__mro__)
+
+
+# Requests per minute with bursts of up to capacity requests
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        # A quarter of a minute's quota can go out at once
+        self.capacity = capacity or max(1.0, rate_per_minute / 4)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a request may start (0 when one may start now)"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+# Closed: calls pass. Open: calls fail fast until the cooldown ends. Half-open: one
+# probe call is let through; its success closes the circuit, its failure reopens it.
+class CircuitBreaker:
+    def __init__(self, threshold=LLM_BREAKER_THRESHOLD, cooldown=LLM_BREAKER_COOLDOWN, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def retry_after(self):
+        return max(0.0, self.opened_at + self.cooldown - self.clock())
+
+    def allow(self):
+        if self.state == "closed":
+            return True
+        if self.state == "open" and self.retry_after() <= 0:
+            self.state = "half-open"
+            self.probing = False
+        if self.state == "half-open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == "half-open" or self.failures >= self.threshold:
+            self.state = "open"
+            self.opened_at = self.clock()
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "model_name")
+
+    def __init__(self, priority, seq, model_name):
+        self.priority = priority
+        self.seq = seq
+        self.model_name = model_name
+
+
+class LLMScheduler:
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, rate_limits=None, default_rpm=LLM_DEFAULT_RPM,
+                 max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX,
+                 breaker_threshold=LLM_BREAKER_THRESHOLD, breaker_cooldown=LLM_BREAKER_COOLDOWN,
+                 queue_timeout=LLM_QUEUE_TIMEOUT, clock=time.monotonic, sleep=time.sleep, rng=None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limits = parse_rate_limits(LLM_RATE_LIMITS) if rate_limits is None else {model_key(name): rpm for name, rpm in rate_limits.items()}
+        self.default_rpm = default_rpm
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiters = []
+        self._seq = 0
+        self._buckets = {}
+        self._breakers = {}
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _bucket(self, model_name):
+        model_name = model_key(model_name)
+        if model_name not in self._buckets:
+            rpm = self.rate_limits.get(model_name, self.default_rpm)
+            self._buckets[model_name] = TokenBucket(rpm, clock=self.clock) if rpm > 0 else None
+        return self._buckets[model_name]
+
+    def breaker(self, model_name):
+        model_name = model_key(model_name)
+        if model_name not in self._breakers:
+            self._breakers[model_name] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown, self.clock)
+        return self._breakers[model_name]
+
+    # The waiter allowed to start next (highest priority whose model has quota) and,
+    # when none can start yet, how long until a bucket refills
+    def _next_waiter(self):
+        delay = None
+        for waiter in sorted(self._waiters, key=lambda w: (w.priority, w.seq)):
+            bucket = self._bucket(waiter.model_name)
+            wait = bucket.wait_time() if bucket else 0.0
+            if wait <= 0:
+                return waiter, None
+            delay = wait if delay is None else min(delay, wait)
+        return None, delay
+
+    def _acquire(self, model_name, priority):
+        with self._condition:
+            waiter = _Waiter(priority, self._seq, model_name)
+            self._seq += 1
+            self._waiters.append(waiter)
+            deadline = self.clock() + self.queue_timeout
+            try:
+                while True:
+                    delay = None
+                    if self._in_flight < self.max_in_flight:
+                        chosen, delay = self._next_waiter()
+                        if chosen is waiter:
+                            bucket = self._bucket(model_name)
+                            if bucket:
+                                bucket.take()
+                            self._in_flight += 1
+                            self.counters["calls"] += 1
+                            return
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.counters["rejected"] += 1
+                        raise QueueTimeoutError(
+                            f"Gemini is busy: no slot for {model_name} within {self.queue_timeout:g} s",
+                            retry_after=delay)
+                    self._condition.wait(min(remaining, delay) if delay else remaining)
+            finally:
+                self._waiters.remove(waiter)
+                # Whoever is next may be able to start now
+                self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given retry (0-based)"""
+        return self.rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def run(self, model_name, call, priority=PRIORITY_ANALYSIS):
+        """Run call() under the model's rate limit, the global cap and the circuit breaker"""
+        started = self.clock()
+        with self._condition:
+            breaker = self.breaker(model_name)
+        attempt = 0
+        while True:
+            with self._condition:
+                if not breaker.allow():
+                    self.counters["rejected"] += 1
+                    retry_after = breaker.retry_after()
+                    raise CircuitOpenError(
+                        f"Gemini ({model_name}) is failing; not retrying for {math.ceil(retry_after)} s",
+                        retry_after=retry_after)
+            try:
+                self._acquire(model_name, priority)
+            except QueueTimeoutError:
+                with self._condition:
+                    breaker.probing = False
+                raise
+            if attempt == 0:
+                annotate(queued_seconds=round(self.clock() - started, 4))
+            try:
+                result = call()
+            except Exception as e:
+                self._release()
+                with self._condition:
+                    if not is_retryable(e):
+                        # The request itself was bad; the backend answered, so it is healthy
+                        breaker.record_success()
+                        raise
+                    breaker.record_failure()
+                    self.counters["failures"] += 1
+                    give_up = attempt >= self.max_retries or breaker.state == "open"
+                if give_up:
+                    raise
+                self.counters["retries"] += 1
+                annotate(retries=attempt + 1)
+                self.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Interrupted, not failed (e.g. a Streamlit rerun raised from a streaming
+                # callback): free the slot and let the next call probe the breaker again
+                self._release()
+                with self._condition:
+                    breaker.probing = False
+                raise
+            self._release()
+            with self._condition:
+                breaker.record_success()
+            return result
+
+    def snapshot(self):
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "breakers": {name: breaker.state for name, breaker in self._breakers.items()},
+                **self.counters,
+            }
+
+
+llm_scheduler = LLMScheduler()
@@ -1,8 +1,8 @@
 import streamlit as st
-import os
 from dotenv import load_dotenv
 import streamlit.runtime.scriptrunner as scriptrunner
 import contextlib
+import textwrap
 
 # Load environment variables
 load_dotenv()
@@ -279,25 +279,42 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Now we can safely import other modules
-from Home import extract_text_from_pdf, analyze_resume, calculate_match_score, suggest_courses, calculate_ats_score, show_analysis
+from Home import extract_text_from_pdf, show_analysis, show_debug_panel
 from ResumeBuilder import main as resume_builder_main
+from PdfCache import pdf_text_cache
+from AnalysisPipeline import run_analysis
+from GeminiService import generate_text, display_text
+from LLMScheduler import PRIORITY_CHAT
+import GeminiClient
+import Telemetry
+from ChatMemory import Conversation, CHAT_RENDER_LAST, CHAT_PAGE_SIZE
+
+# Keep this many traced requests per session for the debug panel
+TRACE_HISTORY = 20
 
 # Wrap the main app logic in the context manager
 with safe_streamlit_context():
     # Initialize session state with context
     if "page" not in st.session_state:
         st.session_state.page = "home"
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = Conversation()
+    if "chat_pages" not in st.session_state:
+        st.session_state.chat_pages = 0
+    if "telemetry_traces" not in st.session_state:
+        st.session_state.telemetry_traces = []
+
+    # Optional /metrics endpoint, started once per process
+    Telemetry.start_metrics_server()
+
+    def remember_trace(trace):
+        st.session_state.telemetry_traces = (st.session_state.telemetry_traces + [trace.to_dict()])[-TRACE_HISTORY:]
 
     # Chatbot helper function
-    def get_chatbot_response(user_input):
-        import google.generativeai as genai
-        
+    def get_chatbot_response(user_input, on_chunk=None, conversation=None):
         try:
-            # Configure the model
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel("gemini-1.5-pro")
+            # Shared, pre-configured model handle
+            model = GeminiClient.get_model("gemini-1.5-pro")
             
             # Create a context-aware prompt
             context = """You are a helpful career and resume assistant. You can:
@@ -308,10 +325,13 @@ with safe_streamlit_context():
             5. Explain industry trends
             Please provide concise, practical advice."""
             
-            prompt = f"{context}\n\nUser: {user_input}\nAssistant:"
+            # With a conversation the prompt carries its summary and recent turns (ending with user_input)
+            if conversation is not None:
+                prompt = conversation.build_prompt(context)
+            else:
+                prompt = f"{context}\n\nUser: {user_input}\nAssistant:"
             
-            response = model.generate_content(prompt)
-            return response.text
+            return display_text(generate_text(model, prompt, on_chunk, priority=PRIORITY_CHAT))
         except Exception as e:
             st.error(f"Error: {str(e)}")
             return "I apologize, but I'm having trouble connecting to the AI service. Please try again in a moment."
@@ -356,36 +376,66 @@ with safe_streamlit_context():
     )
 
     # Send button with icon
+    pending_question = None
     if st.sidebar.button("📤 Send", key="send_button"):
         if user_input:
-            st.session_state.chat_history.append(("user", user_input))
-            bot_response = get_chatbot_response(user_input)
-            st.session_state.chat_history.append(("bot", bot_response))
+            st.session_state.conversation.add("user", user_input)
+            pending_question = user_input
+
+    # Chat bubble markup shared by the history and the streamed reply
+    def chat_message_html(role, message):
+        if role == "user":
+            return f"""
+                <div class="chat-message user">
+                    <div><strong>You</strong></div>
+                    <div class="message-content">{message}</div>
+                </div>
+            """
+        return f"""
+            <div class="chat-message bot">
+                <div><strong>AI Assistant</strong></div>
+                <div class="message-content">{message}</div>
+            </div>
+        """
 
-    # Display chat history with improved styling
+    # Display chat history with improved styling: only the latest messages are rendered,
+    # older ones a page at a time on request, all in one markdown element
+    conversation = st.session_state.conversation
     chat_container = st.sidebar.container()
     with chat_container:
-        for role, message in st.session_state.chat_history:
-            if role == "user":
-                st.markdown(f"""
-                    <div class="chat-message user">
-                        <div><strong>You</strong></div>
-                        <div class="message-content">{message}</div>
-                    </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                    <div class="chat-message bot">
-                        <div><strong>AI Assistant</strong></div>
-                        <div class="message-content">{message}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+        visible = CHAT_RENDER_LAST + st.session_state.chat_pages * CHAT_PAGE_SIZE
+        hidden = len(conversation) - visible
+        if hidden > 0:
+            if st.button(f"⬆️ Show {min(hidden, CHAT_PAGE_SIZE)} earlier messages", key="chat_earlier"):
+                st.session_state.chat_pages += 1
+                st.rerun()
+        elif conversation.dropped:
+            st.caption(f"{conversation.dropped} earlier messages are kept as a summary for the assistant.")
+        if conversation:
+            st.markdown("\n".join(textwrap.dedent(chat_message_html(message.role, message.text)).strip()
+                                   for message in conversation.recent(visible)), unsafe_allow_html=True)
+
+        # Stream the reply to a new question below the history
+        if pending_question:
+            reply_slot = st.empty()
+            with Telemetry.trace("chat") as chat_trace, \
+                    Telemetry.span("chat.response", question_chars=len(pending_question)) as chat_span:
+                bot_response = get_chatbot_response(
+                    pending_question,
+                    lambda piece, text: reply_slot.markdown(chat_message_html("bot", text + " ▌"), unsafe_allow_html=True),
+                    conversation,
+                )
+                chat_span.set(response_chars=len(bot_response))
+            remember_trace(chat_trace)
+            reply_slot.markdown(chat_message_html("bot", bot_response), unsafe_allow_html=True)
+            conversation.add("bot", bot_response)
         
         # Clear chat button with improved styling
-        if st.session_state.chat_history:
+        if conversation:
             st.markdown('<div style="margin-top: 1rem;">', unsafe_allow_html=True)
             if st.button("🗑️ Clear Chat", key="clear_chat"):
-                st.session_state.chat_history = []
+                conversation.clear()
+                st.session_state.chat_pages = 0
                 st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -430,20 +480,56 @@ with safe_streamlit_context():
                 </div>
             """, unsafe_allow_html=True)
             
-            file_path = f"./{uploaded_file.name}"
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            resume_text = extract_text_from_pdf(file_path)
+            # Parse the upload in memory, and only once across reruns and sessions
+            with Telemetry.trace("upload") as upload_trace, \
+                    Telemetry.span("pdf.upload", bytes=uploaded_file.size) as upload_span:
+                resume_text = pdf_text_cache.get_or_extract(uploaded_file, extract_text_from_pdf)
+            # Reruns hit the cache; only real extractions are worth a panel entry
+            if upload_span.attributes.get("cache") == "miss":
+                remember_trace(upload_trace)
             
             if st.sidebar.button("🚀 Analyze Resume", key="analyze_button"):
                 with st.spinner("🔍 Analyzing your resume..."):
-                    analysis = analyze_resume(resume_text, job_description)
-                    match_score = calculate_match_score(resume_text, job_description)
-                    course_suggestions = suggest_courses(resume_text)
-                    ats_score = calculate_ats_score(resume_text, job_description)
+                    # Reserve the score card slot and the tabs first so Gemini output can stream into them
+                    score_card = st.empty()
+                    tab1, tab2, tab3 = st.tabs(["📝 Resume Analysis", "🎯 Skill Match", "📚 Course Suggestions"])
+
+                    with tab1:
+                        st.markdown("""
+                            <div style='background-color: var(--background-tertiary); padding: 1.5rem; border-radius: 0.5rem; border: 1px solid var(--border-color);'>
+                                <h3>Detailed Resume Analysis</h3>
+                        """, unsafe_allow_html=True)
+                        analysis_slot = st.empty()
+                        st.markdown("</div>", unsafe_allow_html=True)
+
+                    with tab3:
+                        st.markdown("""
+                            <div style='background-color: var(--background-tertiary); padding: 1.5rem; border-radius: 0.5rem; border: 1px solid var(--border-color);'>
+                                <h3>Recommended Courses</h3>
+                        """, unsafe_allow_html=True)
+                        courses_slot = st.empty()
+                        st.markdown("</div>", unsafe_allow_html=True)
+
+                    stream_slots = {"analysis": analysis_slot, "courses": courses_slot}
+
+                    def render_stream(stage, text):
+                        stream_slots[stage].markdown(text + " ▌")
+
+                    # Both Gemini calls run concurrently and stream while the local scorers run here
+                    with Telemetry.trace("analyze") as analyze_trace, \
+                            Telemetry.span("analysis.run", resume_chars=len(resume_text),
+                                           job_chars=len(job_description or "")) as analyze_span:
+                        result = run_analysis(resume_text, job_description, on_chunk=render_stream)
+                        if result.errors:
+                            analyze_span.fail("; ".join(f"{stage}: {error}" for stage, error in result.errors.items()))
+                    remember_trace(analyze_trace)
+                    analysis = result.analysis
+                    match_score = result.match_score
+                    course_suggestions = result.course_suggestions
+                    ats_score = result.ats_score
                     
                     # Display ATS Score
-                    st.markdown(f"""
+                    score_card.markdown(f"""
                         <div class="ats-score-card">
                             <div class="score-header">
                                 <div>
@@ -479,19 +565,13 @@ with safe_streamlit_context():
                         </div>
                     """, unsafe_allow_html=True)
 
-                    # Display detailed analysis in tabs
-                    tab1, tab2, tab3 = st.tabs(["📝 Resume Analysis", "🎯 Skill Match", "📚 Course Suggestions"])
-                    
+                    # Replace the streamed text with the final responses
                     with tab1:
-                        st.markdown("""
-                            <div style='background-color: var(--background-tertiary); padding: 1.5rem; border-radius: 0.5rem; border: 1px solid var(--border-color);'>
-                                <h3>Detailed Resume Analysis</h3>
-                        """, unsafe_allow_html=True)
                         if isinstance(analysis, str):
-                            st.markdown(f"<p>{analysis}</p>", unsafe_allow_html=True)
+                            analysis_slot.markdown(f"<p>{analysis}</p>", unsafe_allow_html=True)
                         else:
-                            show_analysis(analysis, None)
-                        st.markdown("</div>", unsafe_allow_html=True)
+                            with analysis_slot.container():
+                                show_analysis(analysis, None)
                     
                     with tab2:
                         st.markdown("""
@@ -499,45 +579,49 @@ with safe_streamlit_context():
                                 <h3>Skills and Keywords Analysis</h3>
                         """, unsafe_allow_html=True)
                         
-                        # Handle skills analysis based on data type
-                        if isinstance(analysis, dict) and 'skills_match' in analysis:
-                            for skill, match in analysis['skills_match'].items():
-                                st.markdown(f"""
-                                    <div class="score-item">
-                                        <span class="score-item-icon">💡</span>
-                                        <div style="flex-grow: 1;">
-                                            <strong>{skill}</strong>
-                                            <div class="progress-bar-container">
-                                                <div class="progress-bar" style="width: {match * 100}%;"></div>
-                                            </div>
+                        # Skills the job description asks for, scored locally against the resume
+                        skills_match = result.skills_match
+                        if skills_match:
+                            st.markdown("\n".join(textwrap.dedent(f"""
+                                <div class="score-item">
+                                    <span class="score-item-icon">💡</span>
+                                    <div style="flex-grow: 1;">
+                                        <strong>{skill}</strong>
+                                        <div class="progress-bar-container">
+                                            <div class="progress-bar" style="width: {match * 100}%;"></div>
                                         </div>
-                                        <span>{int(match * 100)}%</span>
                                     </div>
-                                """, unsafe_allow_html=True)
+                                    <span>{int(match * 100)}%</span>
+                                </div>
+                            """).strip() for skill, match in skills_match.items()), unsafe_allow_html=True)
+                        elif not job_description:
+                            st.info("Add a job description to see how your skills match it.")
                         else:
                             st.info("Skills analysis not available for this resume.")
                         st.markdown("</div>", unsafe_allow_html=True)
                     
                     with tab3:
-                        st.markdown("""
-                            <div style='background-color: var(--background-tertiary); padding: 1.5rem; border-radius: 0.5rem; border: 1px solid var(--border-color);'>
-                                <h3>Recommended Courses</h3>
-                        """, unsafe_allow_html=True)
                         if isinstance(course_suggestions, (list, tuple)) and course_suggestions:
-                            for course in course_suggestions:
-                                st.markdown(f"""
-                                    <div class="score-item">
-                                        <span class="score-item-icon">📚</span>
-                                        <strong>{course}</strong>
-                                    </div>
-                                """, unsafe_allow_html=True)
+                            with courses_slot.container():
+                                for course in course_suggestions:
+                                    st.markdown(f"""
+                                        <div class="score-item">
+                                            <span class="score-item-icon">📚</span>
+                                            <strong>{course}</strong>
+                                        </div>
+                                    """, unsafe_allow_html=True)
+                        elif isinstance(course_suggestions, str) and course_suggestions:
+                            courses_slot.markdown(course_suggestions)
                         else:
-                            st.info("No course suggestions available at this time.")
-                        st.markdown("</div>", unsafe_allow_html=True)
+                            courses_slot.info("No course suggestions available at this time.")
 
     elif st.session_state.page == "resume_builder":
         resume_builder_main()
 
+    # Per-session stage timings, enabled with TELEMETRY_DEBUG_PANEL
+    if Telemetry.TELEMETRY_DEBUG_PANEL:
+        show_debug_panel(st.session_state.telemetry_traces)
+
 # Error handling for script context
 def handle_script_context_error(func):
     def wrapper(*args, **kwargs):
@@ -547,13 +631,10 @@ def handle_script_context_error(func):
 
 # Wrap the chatbot function with error handling
 @handle_script_context_error
-def get_chatbot_response(user_input):
-    import google.generativeai as genai
-    
+def get_chatbot_response(user_input, on_chunk=None, conversation=None):
     try:
-        # Configure the model
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        model = genai.GenerativeModel("gemini-1.5-pro")
+        # Shared, pre-configured model handle
+        model = GeminiClient.get_model("gemini-1.5-pro")
         
         # Create a context-aware prompt
         context = """You are a helpful career and resume assistant. You can:
@@ -564,10 +645,13 @@ def get_chatbot_response(user_input):
         5. Explain industry trends
         Please provide concise, practical advice."""
         
-        prompt = f"{context}\n\nUser: {user_input}\nAssistant:"
+        # With a conversation the prompt carries its summary and recent turns (ending with user_input)
+        if conversation is not None:
+            prompt = conversation.build_prompt(context)
+        else:
+            prompt = f"{context}\n\nUser: {user_input}\nAssistant:"
         
-        response = model.generate_content(prompt)
-        return response.text
+        return display_text(generate_text(model, prompt, on_chunk, priority=PRIORITY_CHAT))
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return "I apologize, but I'm having trouble connecting to the AI service. Please try again in a moment."
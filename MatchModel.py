@@ -0,0 +1,276 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from TextPipeline import analyze_text
+
+# Load environment variables
+load_dotenv()
+
+# Persistent TF-IDF model behind calculate_match_score. Terms come from the shared
+# TextPipeline tokenization (the same terms as TfidfVectorizer) and are hashed into a
+# fixed feature space, so the document frequencies can grow as new resumes and
+# postings arrive without refitting.
+MATCH_MODEL_PATH = os.getenv("MATCH_MODEL_PATH", ".cache/match_model.npz")
+MATCH_MODEL_FEATURES = int(os.getenv("MATCH_MODEL_FEATURES", str(2 ** 20)))
+MATCH_VECTOR_CACHE_SIZE = int(os.getenv("MATCH_VECTOR_CACHE_SIZE", "512"))
+# New documents are folded into the IDF in batches so cached vectors stay valid in between
+MATCH_IDF_REFRESH_EVERY = int(os.getenv("MATCH_IDF_REFRESH_EVERY", "32"))
+MATCH_SEEN_LIMIT = 200000
+# Fold the documents users analyze into the IDF (saved to MATCH_MODEL_PATH); off by
+# default so interactive scores only change when the model is refitted
+MATCH_MODEL_LEARN = os.getenv("MATCH_MODEL_LEARN", "false").lower() in ("1", "true", "yes")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class _CachedVector:
+    __slots__ = ("counts", "version", "weighted")
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.version = -1
+        self.weighted = None
+
+
+class MatchModel:
+    def __init__(self, n_features=MATCH_MODEL_FEATURES, cache_size=MATCH_VECTOR_CACHE_SIZE,
+                 refresh_every=MATCH_IDF_REFRESH_EVERY):
+        import numpy as np
+
+        self.n_features = n_features
+        self.cache_size = cache_size
+        self.refresh_every = max(1, refresh_every)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.version = 0
+        self._pending_freq = {}
+        self._pending_docs = 0
+        self._seen = OrderedDict()
+        self._vectors = OrderedDict()
+        self._hasher = None
+        self._lock = threading.RLock()
+
+    def _get_hasher(self):
+        if self._hasher is None:
+            from sklearn.feature_extraction import FeatureHasher
+
+            # Hashes (term, count) pairs to the same columns HashingVectorizer used,
+            # so models saved before the shared tokenizer stay valid
+            self._hasher = FeatureHasher(n_features=self.n_features, input_type="pair", alternate_sign=False)
+        return self._hasher
+
+    def _count_vector(self, text, key):
+        cached = self._vectors.get(key)
+        if cached is None:
+            term_counts = analyze_text(text).term_counts
+            counts = self._get_hasher().transform([term_counts.items()]).tocsr()
+            counts.sum_duplicates()
+            cached = _CachedVector(counts)
+            self._vectors[key] = cached
+            while len(self._vectors) > self.cache_size:
+                self._vectors.popitem(last=False)
+        else:
+            self._vectors.move_to_end(key)
+        return cached
+
+    def _idf(self, indices):
+        import numpy as np
+
+        # Smoothed IDF, as TfidfVectorizer(smooth_idf=True) computes it
+        return np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq[indices])) + 1.0
+
+    def vector(self, text):
+        """Return the L2-normalized TF-IDF row for text, reusing cached vectors"""
+        import numpy as np
+
+        with self._lock:
+            cached = self._count_vector(text, _text_digest(text))
+            if cached.version != self.version:
+                weighted = cached.counts.copy()
+                weighted.data = weighted.data * self._idf(weighted.indices)
+                norm = np.sqrt(np.dot(weighted.data, weighted.data))
+                if norm > 0:
+                    weighted.data /= norm
+                cached.weighted = weighted
+                cached.version = self.version
+            return cached.weighted
+
+    def similarity(self, text_a, text_b):
+        """Cosine similarity of two documents under the current IDF"""
+        a = self.vector(text_a)
+        b = self.vector(text_b)
+        return float(a.multiply(b).sum())
+
+    def observe(self, texts):
+        """Count previously unseen documents towards the IDF"""
+        with self._lock:
+            for text in texts:
+                if not text:
+                    continue
+                key = _text_digest(text)
+                if key in self._seen:
+                    continue
+                self._seen[key] = None
+                while len(self._seen) > MATCH_SEEN_LIMIT:
+                    self._seen.popitem(last=False)
+                for index in self._count_vector(text, key).counts.indices:
+                    self._pending_freq[index] = self._pending_freq.get(index, 0) + 1
+                self._pending_docs += 1
+            if self._pending_docs >= self.refresh_every:
+                self.refresh()
+
+    def refresh(self):
+        """Fold pending documents into the IDF, invalidating cached weighted vectors"""
+        import numpy as np
+
+        with self._lock:
+            if not self._pending_docs:
+                return
+            indices = np.fromiter(self._pending_freq.keys(), dtype=np.int64, count=len(self._pending_freq))
+            counts = np.fromiter(self._pending_freq.values(), dtype=np.int64, count=len(self._pending_freq))
+            self.doc_freq[indices] += counts
+            self.n_docs += self._pending_docs
+            self._pending_freq = {}
+            self._pending_docs = 0
+            self.version += 1
+
+    def fit(self, corpus):
+        """Reset and fit document frequencies on a reference corpus"""
+        with self._lock:
+            self.doc_freq[:] = 0
+            self.n_docs = 0
+            self._pending_freq = {}
+            self._pending_docs = 0
+            self._seen.clear()
+            self.observe(corpus)
+            self.refresh()
+        return self
+
+    def save(self, path=MATCH_MODEL_PATH):
+        """Write the model atomically so other processes never load a partial file"""
+        import numpy as np
+
+        with self._lock:
+            self.refresh()
+            nonzero = np.flatnonzero(self.doc_freq)
+            # Raw bytes: an "S16" array would strip trailing NUL bytes from the digests
+            seen = np.frombuffer(b"".join(self._seen.keys()), dtype=np.uint8).reshape(-1, 16)
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f, n_features=self.n_features, n_docs=self.n_docs,
+                    df_indices=nonzero.astype(np.int64), df_values=self.doc_freq[nonzero], seen=seen,
+                )
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MATCH_MODEL_PATH):
+        import numpy as np
+
+        with np.load(path) as data:
+            model = cls(n_features=int(data["n_features"]))
+            model.n_docs = int(data["n_docs"])
+            model.doc_freq[data["df_indices"]] = data["df_values"]
+            seen = data["seen"]
+            if seen.dtype.kind == "S":
+                # Saved before digests were stored as raw bytes
+                keys = seen.tolist()
+            else:
+                raw = seen.tobytes()
+                keys = [raw[i:i + 16] for i in range(0, len(raw), 16)]
+            for key in keys:
+                model._seen[key] = None
+        return model
+
+
+# Process-wide model, loaded from MATCH_MODEL_PATH once when it exists
+def get_match_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = MatchModel.load(MATCH_MODEL_PATH) if os.path.exists(MATCH_MODEL_PATH) else MatchModel()
+    return _model
+
+
+# Count texts towards the process-wide model's IDF, saving the model each time a batch
+# is folded in so what it learned survives a restart
+def learn_documents(texts):
+    model = get_match_model()
+    with model._lock:
+        version = model.version
+        model.observe(texts)
+        if model.version != version:
+            model.save(MATCH_MODEL_PATH)
+
+
+# Flatten a Resume Builder JSON file into plain text
+def resume_json_text(data):
+    parts = []
+
+    def walk(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+        elif value:
+            parts.append(str(value))
+
+    walk(data)
+    return "\n".join(parts)
+
+
+# Text of one .txt, .json (Resume Builder) or .pdf file; None for other file types
+def read_document(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".txt":
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    if ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            return resume_json_text(json.load(f))
+    if ext == ".pdf":
+        from PdfExtract import extract_pdf_text
+
+        return extract_pdf_text(path)[0]
+    return None
+
+
+# Read corpus documents: .txt, .json (Resume Builder output) and .pdf files
+def read_corpus(paths):
+    for pattern in paths:
+        matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True) if os.path.isdir(pattern) else glob.glob(pattern)
+        for path in sorted(matches):
+            text = read_document(path)
+            if text is not None:
+                yield text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the TF-IDF match model on a reference corpus")
+    parser.add_argument("paths", nargs="+", help="directories or globs of .txt, .json and .pdf documents")
+    parser.add_argument("--output", default=MATCH_MODEL_PATH)
+    args = parser.parse_args()
+
+    model = MatchModel().fit(read_corpus(args.paths))
+    model.save(args.output)
+    print(f"Fitted on {model.n_docs} documents, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
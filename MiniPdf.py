@@ -0,0 +1,343 @@
+import os
+import re
+import struct
+import textwrap
+import zlib
+from functools import lru_cache
+
+# Minimal PDF writer for plain text documents: standard Helvetica fonts, one content
+# stream per page, no external dependencies. Used to generate benchmark corpora and
+# simple exports; the output opens in pdfplumber, PyPDF2 and regular viewers.
+# Characters outside WinAnsiEncoding (Ł, 王, ...) are drawn with embedded TrueType
+# fonts, subset to the glyphs used; text no font can show raises an error rather
+# than being replaced.
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 54
+FONT_SIZE = 10
+LEADING = 1.35
+
+_FONTS = {False: "F1", True: "F2"}
+_CONTROL = re.compile("[\x00-\x1f\x7f]")
+
+
+class UnsupportedCharactersError(ValueError):
+    def __init__(self, characters):
+        self.characters = "".join(sorted(set(characters)))
+        super().__init__(f"No available font can show these characters: {self.characters}")
+
+
+# The parts of a TrueType font (or the first font of a collection) that PDF embedding
+# needs: glyph ids by code point, advance widths and metrics
+class TrueTypeFont:
+    def __init__(self, data, name="EmbeddedFont"):
+        offset = struct.unpack(">I", data[12:16])[0] if data[:4] == b"ttcf" else 0
+        num_tables = struct.unpack(">H", data[offset + 4:offset + 6])[0]
+        self.tables = {}
+        for i in range(num_tables):
+            tag, _, start, length = struct.unpack(">4sIII", data[offset + 12 + 16 * i:offset + 28 + 16 * i])
+            self.tables[tag.decode("latin-1")] = data[start:start + length]
+        if "glyf" not in self.tables or "loca" not in self.tables:
+            raise ValueError(f"{name} has no TrueType outlines (CFF/OpenType fonts cannot be embedded)")
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", name) or "EmbeddedFont"
+        head, hhea = self.tables["head"], self.tables["hhea"]
+        self.units_per_em = struct.unpack(">H", head[18:20])[0]
+        self.bbox = [self._scale(v) for v in struct.unpack(">hhhh", head[36:44])]
+        self.ascent, self.descent = (self._scale(v) for v in struct.unpack(">hh", hhea[4:8]))
+        self.num_glyphs = struct.unpack(">H", self.tables["maxp"][4:6])[0]
+        metrics = struct.unpack(">H", hhea[34:36])[0]
+        advances = struct.unpack(f">{metrics * 2}H", self.tables["hmtx"][:metrics * 4])[::2]
+        self.widths = [self._scale(advances[min(gid, metrics - 1)]) for gid in range(self.num_glyphs)]
+        self.glyphs = self._read_cmap(self.tables["cmap"])
+        count = self.num_glyphs + 1
+        if struct.unpack(">h", head[50:52])[0]:
+            self._loca = struct.unpack(f">{count}I", self.tables["loca"][:count * 4])
+        else:
+            self._loca = [2 * v for v in struct.unpack(f">{count}H", self.tables["loca"][:count * 2])]
+
+    def _scale(self, value):
+        return round(value * 1000 / self.units_per_em)
+
+    # Unicode cmap: format 12 (full range) when present, else format 4 (BMP)
+    @staticmethod
+    def _read_cmap(cmap):
+        subtables = {}
+        for i in range(struct.unpack(">H", cmap[2:4])[0]):
+            platform, encoding, offset = struct.unpack(">HHI", cmap[4 + 8 * i:12 + 8 * i])
+            subtables.setdefault(struct.unpack(">H", cmap[offset:offset + 2])[0], (platform, encoding, offset))
+        glyphs = {}
+        if 12 in subtables:
+            offset = subtables[12][2]
+            for i in range(struct.unpack(">I", cmap[offset + 12:offset + 16])[0]):
+                start, end, gid = struct.unpack(">III", cmap[offset + 16 + 12 * i:offset + 28 + 12 * i])
+                for code in range(start, end + 1):
+                    glyphs[code] = gid + code - start
+        elif 4 in subtables:
+            offset = subtables[4][2]
+            segments = struct.unpack(">H", cmap[offset + 6:offset + 8])[0] // 2
+            ends = offset + 14
+            starts = ends + 2 * segments + 2
+            deltas = starts + 2 * segments
+            range_offsets = deltas + 2 * segments
+            for i in range(segments):
+                end, start = struct.unpack(">H", cmap[ends + 2 * i:ends + 2 * i + 2])[0], \
+                    struct.unpack(">H", cmap[starts + 2 * i:starts + 2 * i + 2])[0]
+                delta = struct.unpack(">h", cmap[deltas + 2 * i:deltas + 2 * i + 2])[0]
+                range_offset = struct.unpack(">H", cmap[range_offsets + 2 * i:range_offsets + 2 * i + 2])[0]
+                for code in range(start, min(end, 0xFFFE) + 1):
+                    if range_offset:
+                        at = range_offsets + 2 * i + range_offset + 2 * (code - start)
+                        gid = struct.unpack(">H", cmap[at:at + 2])[0]
+                        gid = (gid + delta) % 65536 if gid else 0
+                    else:
+                        gid = (code + delta) % 65536
+                    if gid:
+                        glyphs[code] = gid
+        return {code: gid for code, gid in glyphs.items() if 0 < gid}
+
+    def _glyph(self, gid):
+        return self.tables["glyf"][self._loca[gid]:self._loca[gid + 1]]
+
+    def subset(self, gids):
+        """Font file with only the outlines of gids (and their components); glyph ids are unchanged"""
+        keep = set(gids) | {0}
+        stack = list(keep)
+        while stack:
+            glyph = self._glyph(stack.pop())
+            if len(glyph) < 10 or struct.unpack(">h", glyph[:2])[0] >= 0:
+                continue
+            # Composite glyph: follow its component references
+            at = 10
+            while True:
+                flags, component = struct.unpack(">HH", glyph[at:at + 4])
+                if component not in keep:
+                    keep.add(component)
+                    stack.append(component)
+                at += 4 + (4 if flags & 1 else 2) + (2 if flags & 8 else 4 if flags & 0x40 else 8 if flags & 0x80 else 0)
+                if not flags & 0x20:
+                    break
+        glyf = bytearray()
+        loca = []
+        for gid in range(self.num_glyphs):
+            loca.append(len(glyf))
+            if gid in keep:
+                glyf += self._glyph(gid)
+                glyf += b"\0" * (-len(glyf) % 4)
+        loca.append(len(glyf))
+        head = bytearray(self.tables["head"])
+        head[8:12] = b"\0\0\0\0"
+        head[50:52] = struct.pack(">h", 1)
+        tables = {tag: self.tables[tag] for tag in ("hhea", "maxp", "hmtx", "cvt ", "fpgm", "prep") if tag in self.tables}
+        tables.update({"head": bytes(head), "glyf": bytes(glyf), "loca": struct.pack(f">{len(loca)}I", *loca)})
+        return _sfnt(tables)
+
+
+def _checksum(data):
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def _sfnt(tables):
+    tags = sorted(tables)
+    power = 1 << (len(tags).bit_length() - 1)
+    out = bytearray(struct.pack(">IHHHH", 0x00010000, len(tags), power * 16, power.bit_length() - 1,
+                                len(tags) * 16 - power * 16))
+    offset = 12 + 16 * len(tags)
+    body = bytearray()
+    for tag in tags:
+        data = tables[tag]
+        out += struct.pack(">4sIII", tag.encode("latin-1"), _checksum(data), offset + len(body), len(data))
+        body += data + b"\0" * (-len(data) % 4)
+    return bytes(out + body)
+
+
+@lru_cache(maxsize=None)
+def load_font(path):
+    """Parse a .ttf/.ttc file once per process"""
+    with open(path, "rb") as f:
+        return TrueTypeFont(f.read(), os.path.splitext(os.path.basename(path))[0])
+
+
+# WinAnsiEncoding is (nearly) cp1252, which covers bullets, dashes and curly quotes
+def is_winansi(text):
+    """True when the standard Helvetica fonts can show all of text"""
+    try:
+        text.encode("cp1252")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _escape(text):
+    text = text.encode("cp1252").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# Split a line into (font index or None for Helvetica, text) runs; each character
+# outside WinAnsi goes to the first embedded font that has it
+def _runs(text, fonts, used):
+    if is_winansi(text):
+        return [(None, text)] if text else []
+    runs = []
+    missing = []
+    for char in text:
+        index = None
+        if not is_winansi(char):
+            index = next((i for i, font in enumerate(fonts) if ord(char) in font.glyphs), -1)
+            if index < 0:
+                missing.append(char)
+                continue
+            used[index].setdefault(fonts[index].glyphs[ord(char)], char)
+        if runs and runs[-1][0] == index:
+            runs[-1] = (index, runs[-1][1] + char)
+        else:
+            runs.append((index, char))
+    if missing:
+        raise UnsupportedCharactersError(missing)
+    return runs
+
+
+# A line is a string or a (text, size, bold) tuple
+def _line_style(line):
+    if isinstance(line, str):
+        return line, FONT_SIZE, False
+    text, size, bold = (tuple(line) + (FONT_SIZE, False))[:3]
+    return text, size, bold
+
+
+def _page_stream(lines, margin, page_height, fonts=(), used=None):
+    ops = ["BT"]
+    y = page_height - margin
+    for line in lines:
+        text, size, bold = _line_style(line)
+        y -= size * LEADING
+        runs = _runs(_CONTROL.sub("", text), fonts, used) or [(None, "")]
+        if len(runs) == 1 and runs[0][0] is None:
+            ops.append(f"/{_FONTS[bool(bold)]} {size} Tf 1 0 0 1 {margin} {y:.2f} Tm ({_escape(runs[0][1])}) Tj")
+            continue
+        parts = [f"1 0 0 1 {margin} {y:.2f} Tm"]
+        for index, run in runs:
+            if index is None:
+                parts.append(f"/{_FONTS[bool(bold)]} {size} Tf ({_escape(run)}) Tj")
+            elif bold:
+                # Embedded fonts have no bold face; stroking the outlines thickens them
+                glyphs = "".join(f"{fonts[index].glyphs[ord(char)]:04X}" for char in run)
+                parts.append(f"/U{index + 1} {size} Tf 2 Tr {size * 0.04:.2f} w <{glyphs}> Tj 0 Tr")
+            else:
+                glyphs = "".join(f"{fonts[index].glyphs[ord(char)]:04X}" for char in run)
+                parts.append(f"/U{index + 1} {size} Tf <{glyphs}> Tj")
+        ops.append(" ".join(parts))
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+# CMap that maps glyph ids back to text, so embedded-font text can be copied and extracted
+def _to_unicode(used):
+    entries = [f"<{gid:04X}> <{char.encode('utf-16-be').hex().upper()}>" for gid, char in sorted(used.items())]
+    blocks = "".join(f"{len(entries[i:i + 100])} beginbfchar\n" + "\n".join(entries[i:i + 100]) + "\nendbfchar\n"
+                     for i in range(0, len(entries), 100))
+    return ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+            "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n" + blocks +
+            "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend").encode("latin-1")
+
+
+def _stream(data, extra=""):
+    compressed = zlib.compress(data)
+    return b"<< /Length %d /Filter /FlateDecode%s >>\nstream\n" % (len(compressed), extra.encode("latin-1")) + \
+        compressed + b"\nendstream"
+
+
+# Append a subset of font as a Type0 (Identity-H) font; returns its object number
+def _embed_font(objects, font, used):
+    data = font.subset(used)
+    # Subset fonts are named with a six-letter tag derived from their glyphs
+    tag = "".join(chr(65 + b % 26) for b in zlib.crc32(repr(sorted(used)).encode()).to_bytes(4, "big") * 2)[:6]
+    name = f"{tag}+{font.name}"
+    objects.append(_stream(data, f" /Length1 {len(data)}"))
+    objects.append((
+        f"<< /Type /FontDescriptor /FontName /{name} /Flags 32 /FontBBox [{' '.join(map(str, font.bbox))}] "
+        f"/ItalicAngle 0 /Ascent {font.ascent} /Descent {font.descent} /CapHeight {font.ascent} /StemV 80 "
+        f"/FontFile2 {len(objects)} 0 R >>"
+    ).encode("latin-1"))
+    widths = " ".join(f"{gid} [{font.widths[gid]}]" for gid in sorted(used) if gid < font.num_glyphs)
+    objects.append((
+        f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} "
+        f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+        f"/FontDescriptor {len(objects)} 0 R /DW 1000 /W [{widths}] /CIDToGIDMap /Identity >>"
+    ).encode("latin-1"))
+    objects.append(_stream(_to_unicode(used)))
+    objects.append((
+        f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+        f"/DescendantFonts [{len(objects) - 1} 0 R] /ToUnicode {len(objects)} 0 R >>"
+    ).encode("latin-1"))
+    return len(objects)
+
+
+# Split lines into pages by available height
+def paginate(lines, page_height=PAGE_HEIGHT, margin=MARGIN):
+    pages = [[]]
+    available = page_height - 2 * margin
+    used = 0.0
+    for line in lines:
+        height = _line_style(line)[1] * LEADING
+        if used + height > available and pages[-1]:
+            pages.append([])
+            used = 0.0
+        pages[-1].append(line)
+        used += height
+    return pages
+
+
+# Wrap plain text to roughly fit the page width at the given font size
+def wrap_text(text, size=FONT_SIZE, bold=False, page_width=PAGE_WIDTH, margin=MARGIN):
+    width = max(20, int((page_width - 2 * margin) / (size * 0.5)))
+    lines = []
+    for paragraph in (text or "").splitlines() or [""]:
+        wrapped = textwrap.wrap(paragraph, width) or [""]
+        lines.extend((line, size, bold) for line in wrapped)
+    return lines
+
+
+# Serialize pages (lists of lines) into PDF bytes. fonts are TrueTypeFonts tried in
+# order for characters Helvetica cannot show.
+def build_pdf(pages, page_width=PAGE_WIDTH, page_height=PAGE_HEIGHT, margin=MARGIN, fonts=()):
+    pages = pages or [[]]
+    fonts = list(fonts)
+    used = [{} for _ in fonts]  # glyph id -> character, per font
+    streams = [_page_stream(lines, margin, page_height, fonts, used) for lines in pages]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    font_refs = "".join(f" /U{index + 1} {_embed_font(objects, font, used[index])} 0 R"
+                        for index, font in enumerate(fonts) if used[index])
+    page_refs = []
+    for stream in streams:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R{font_refs} >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1"))
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# Plain text to a paginated PDF
+def text_to_pdf(text, size=FONT_SIZE, fonts=()):
+    return build_pdf(paginate(wrap_text(text, size)), fonts=fonts)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from Telemetry import annotate
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration (PDF_CACHE_DIR enables the shared on-disk tier)
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "128"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "")
+
+
+# Content-addressed cache of extracted resume text, keyed by the upload bytes
+class PdfTextCache:
+    def __init__(self, max_entries=PDF_CACHE_SIZE, cache_dir=PDF_CACHE_DIR or None):
+        self.max_entries = max(0, int(max_entries))
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(data):
+        """Return the content hash used as cache key"""
+        if hasattr(data, "getbuffer"):
+            # In-memory uploads are hashed through a view, without copying the bytes
+            with data.getbuffer() as view:
+                return hashlib.sha256(view).hexdigest()
+        return hashlib.sha256(data).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def _remember(self, key, text):
+        # Caller holds the lock
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Look up extracted text, checking memory first and then disk"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    text = f.read()
+            except OSError:
+                text = None
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, text)
+                return text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, text):
+        """Store extracted text in memory and, if enabled, on disk"""
+        with self._lock:
+            self._remember(key, text)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write to a temp file and rename so other processes never see partial text
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+
+    def get_or_extract(self, data, extract):
+        """Return cached text for the PDF bytes or upload, calling extract(data) on a miss"""
+        key = self.key_for(data)
+        text = self.get(key)
+        annotate(cache="miss" if text is None else "hit")
+        if text is None:
+            text = extract(data)
+            # Failed extractions are not cached so the user still sees the error next time
+            if text:
+                self.put(key, text)
+        return text
+
+    def stats(self):
+        """Return hit/miss counters for the cache"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": bool(self.cache_dir),
+            }
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left for other processes)"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache shared by every Streamlit session
+pdf_text_cache = PdfTextCache()
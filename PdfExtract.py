@@ -0,0 +1,213 @@
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from Telemetry import annotate, span
+
+# Load environment variables
+load_dotenv()
+
+# Worker count for parallel extraction (0 means one per CPU) and the page count
+# below which documents are extracted in-process
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+# Extraction status values
+EXTRACT_OK = "ok"
+EXTRACT_FALLBACK = "fallback"
+EXTRACT_FAILED = "failed"
+
+# Ends every extracted page; the form feed lets PromptCompactor find page breaks
+PAGE_BREAK = "\n\f"
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+# Wrap raw upload bytes in a seekable in-memory stream; paths and streams pass through
+def open_pdf_source(pdf_source):
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf_source)
+    if hasattr(pdf_source, "seek"):
+        pdf_source.seek(0)
+    return pdf_source
+
+
+# Read any supported source into bytes so it can be shipped to worker processes
+def read_pdf_bytes(pdf_source):
+    if isinstance(pdf_source, bytes):
+        return pdf_source
+    if isinstance(pdf_source, (bytearray, memoryview)):
+        return bytes(pdf_source)
+    if hasattr(pdf_source, "getvalue"):
+        return pdf_source.getvalue()
+    if hasattr(pdf_source, "read"):
+        pdf_source.seek(0)
+        return pdf_source.read()
+    with open(pdf_source, "rb") as f:
+        return f.read()
+
+
+# Extract one page and drop its parsed layout objects; pdfplumber otherwise keeps
+# every page's characters alive until the document is closed
+def _page_text(page):
+    try:
+        return page.extract_text()
+    finally:
+        close = getattr(page, "close", None)
+        if close is not None:
+            close()
+
+
+# Extract pages [start, stop) with pdfplumber, falling back to PyPDF2 for the chunk
+def extract_page_range(pdf_source, start=0, stop=None):
+    """Return (text, status) for a page range; status is ok, fallback or failed"""
+    import pdfplumber
+
+    try:
+        with span("pdf.pdfplumber") as record:
+            parts = []
+            with pdfplumber.open(open_pdf_source(pdf_source)) as pdf:
+                pages = pdf.pages[start:stop]
+                record.set(pages=len(pages))
+                for page in pages:
+                    page_text = _page_text(page)
+                    if page_text:
+                        parts.append(page_text + PAGE_BREAK)
+            return "".join(parts), EXTRACT_OK
+    except Exception:
+        pass
+
+    try:
+        with span("pdf.pypdf2_fallback") as record:
+            from PyPDF2 import PdfReader
+
+            pdf_reader = PdfReader(open_pdf_source(pdf_source))
+            pages = pdf_reader.pages[start:stop]
+            record.set(pages=len(pages))
+            parts = [(page.extract_text() or "") + PAGE_BREAK for page in pages]
+            return "".join(parts), EXTRACT_FALLBACK
+    except Exception:
+        return "", EXTRACT_FAILED
+
+
+# Open the document once: extract it inline when it is short, otherwise just count pages
+def _extract_if_short(pdf_source, parallel_threshold):
+    import pdfplumber
+
+    try:
+        with pdfplumber.open(open_pdf_source(pdf_source)) as pdf:
+            n_pages = len(pdf.pages)
+            annotate(pages=n_pages)
+            if n_pages >= parallel_threshold:
+                return None, n_pages
+            parts = []
+            for page in pdf.pages:
+                page_text = _page_text(page)
+                if page_text:
+                    parts.append(page_text + PAGE_BREAK)
+            return ("".join(parts), EXTRACT_OK), n_pages
+    except Exception:
+        # Let the per-range path run its PyPDF2 fallback
+        return extract_page_range(pdf_source), None
+
+
+def _resolve_workers(workers):
+    if workers is None:
+        workers = PDF_EXTRACT_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Spawn rather than fork: the Streamlit server process is multi-threaded
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared extraction worker pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+# Split n_pages into contiguous ranges, a couple per worker for load balancing
+def page_ranges(n_pages, workers):
+    n_chunks = max(1, min(n_pages, workers * 2))
+    size, extra = divmod(n_pages, n_chunks)
+    ranges = []
+    start = 0
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+# Extract text from a PDF, fanning page ranges out to a process pool for long documents
+def extract_pdf_text(pdf_source, workers=None, parallel_threshold=None):
+    """Return (text, status); status is ok, fallback (PyPDF2 used) or failed"""
+    with span("pdf.extract") as record:
+        text, status = _extract_pdf_text(pdf_source, workers, parallel_threshold)
+        record.set(chars=len(text), status=status)
+        if status == EXTRACT_FAILED:
+            record.fail("no text could be extracted")
+        return text, status
+
+
+def _extract_pdf_text(pdf_source, workers, parallel_threshold):
+    workers = _resolve_workers(workers)
+    if parallel_threshold is None:
+        parallel_threshold = PDF_PARALLEL_MIN_PAGES
+
+    if workers <= 1 or parallel_threshold <= 0:
+        result = extract_page_range(pdf_source)
+    else:
+        result, n_pages = _extract_if_short(pdf_source, parallel_threshold)
+    if result is not None:
+        text, status = result
+        return (text.strip() if status != EXTRACT_FAILED else ""), status
+
+    data = read_pdf_bytes(pdf_source)
+    annotate(parallel=f"{workers} workers")
+    try:
+        pool = _get_pool(workers)
+        futures = [pool.submit(extract_page_range, data, start, stop)
+                   for start, stop in page_ranges(n_pages, workers)]
+        results = [future.result() for future in futures]
+    except Exception:
+        # A broken or shut down pool should not fail the upload; extract in-process
+        shutdown_pool()
+        text, status = extract_page_range(data)
+        return (text.strip() if status != EXTRACT_FAILED else ""), status
+
+    # Join chunk results in page order
+    parts = []
+    status = EXTRACT_OK
+    for chunk_text, chunk_status in results:
+        if chunk_status == EXTRACT_FAILED:
+            return "", EXTRACT_FAILED
+        if chunk_status == EXTRACT_FALLBACK:
+            status = EXTRACT_FALLBACK
+        parts.append(chunk_text)
+    return "".join(parts).strip(), status
@@ -0,0 +1,261 @@
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from dotenv import load_dotenv
+from Telemetry import span
+from TextPipeline import estimate_tokens
+
+# Shrinks extracted resume and job description text before it is pasted into a Gemini
+# prompt: whitespace is normalized, headers/footers repeated on every page are kept
+# once, and if the text is still over its token budget the least useful sections are
+# dropped and the remaining ones trimmed evenly (keeping the start of each section).
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROMPT_COMPACTION = os.getenv("PROMPT_COMPACTION", "true").strip().lower() not in ("0", "false", "no", "off")
+# Token budgets per kind of text (estimated at about four characters per token)
+PROMPT_RESUME_TOKENS = int(os.getenv("PROMPT_RESUME_TOKENS", "2000"))
+PROMPT_JOB_TOKENS = int(os.getenv("PROMPT_JOB_TOKENS", "1000"))
+PROMPT_COURSES_TOKENS = int(os.getenv("PROMPT_COURSES_TOKENS", "800"))
+
+# A short line at the top or bottom of this many pages is a running header/footer
+# (documents with fewer pages need it on every page, and on at least two)
+REPEAT_MIN = 3
+_REPEAT_MAX_WORDS = 8
+# Lines this close to a page break can be headers, footers or page numbers
+_EDGE_LINES = 3
+
+_SPACES = re.compile("[ \t\u00a0\u2000-\u200b\u3000]+")
+_CID = re.compile(r"\(cid:\d+\)")
+_PAGE_LABEL = re.compile(r"^page\s*\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_PAGE_NUMBER = re.compile(r"^(-\s*)?(\d+)(\s*-)?$|^(\d+)\s*(of|/)\s*(\d+)$")
+_TRIMMED = "[…]"
+
+# Section headings by kind, in the order their sections are given up when trimming:
+# sections listed first are dropped first, unlisted sections count as most important
+_SECTIONS = {
+    "resume": {
+        "references": "references",
+        "hobbies": "interests", "interests": "interests",
+        "volunteer": "volunteer", "volunteering": "volunteer", "volunteer experience": "volunteer",
+        "languages": "languages",
+        "publications": "publications",
+        "awards": "awards", "honors": "awards", "honors and awards": "awards", "achievements": "awards",
+        "certifications": "certifications", "certificates": "certifications", "licenses": "certifications",
+        "education": "education",
+        "projects": "projects", "personal projects": "projects",
+        "summary": "summary", "professional summary": "summary", "profile": "summary", "objective": "summary",
+        "about me": "summary",
+        "experience": "experience", "work experience": "experience", "professional experience": "experience",
+        "employment history": "experience", "work history": "experience",
+        "skills": "skills", "technical skills": "skills", "core competencies": "skills",
+    },
+    "job": {
+        "equal opportunity": "eeo", "equal opportunity employer": "eeo", "eeo statement": "eeo",
+        "benefits": "benefits", "perks": "benefits", "perks and benefits": "benefits", "what we offer": "benefits",
+        "about us": "company", "about the company": "company", "who we are": "company", "our company": "company",
+        "how to apply": "apply",
+        "nice to have": "preferred", "preferred qualifications": "preferred", "bonus points": "preferred",
+        "about the role": "role", "the role": "role", "overview": "role",
+        "responsibilities": "responsibilities", "what you will do": "responsibilities",
+        "what you'll do": "responsibilities", "key responsibilities": "responsibilities",
+        "requirements": "requirements", "qualifications": "requirements", "required qualifications": "requirements",
+        "what you bring": "requirements", "skills": "requirements", "must have": "requirements",
+    },
+}
+_PRIORITY = {kind: list(dict.fromkeys(names.values())) for kind, names in _SECTIONS.items()}
+
+
+@dataclass
+class CompactText:
+    text: str
+    original_tokens: int
+    tokens: int
+    removed_lines: int = 0
+    dropped_sections: list = field(default_factory=list)
+    trimmed_sections: list = field(default_factory=list)
+
+    @property
+    def saved_tokens(self):
+        return self.original_tokens - self.tokens
+
+
+# Collapse runs of spaces, strip every line and keep at most one blank line in a row
+def normalize_whitespace(text):
+    lines = []
+    for line in _CID.sub("", text.replace("\r\n", "\n").replace("\r", "\n").replace("\f", "\n")).split("\n"):
+        line = _SPACES.sub(" ", line).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+# Split text into pages at form feeds (PdfExtract ends every page with one), each
+# page as its normalized lines
+def split_pages(text):
+    return [lines for lines in map(normalize_whitespace, text.split("\f")) if lines]
+
+
+def _edges(lines):
+    """Indexes of the first and last _EDGE_LINES non-blank lines of a page"""
+    filled = [i for i, line in enumerate(lines) if line]
+    return set(filled[:_EDGE_LINES] + filled[-_EDGE_LINES:])
+
+
+# "3", "- 3 -" or "3 of 5" next to a page break; a bare number larger than the page
+# count (such as a year) is content
+def _is_page_number(line, n_pages):
+    match = _PAGE_NUMBER.match(line)
+    if match is None:
+        return False
+    if match.group(2) is not None:
+        return int(match.group(2)) <= n_pages
+    return int(match.group(4)) <= int(match.group(6))
+
+
+# Keep the first copy of headers/footers repeated at the page breaks (names, URLs) and
+# drop "Page 2 of 3" labels and page numbers; returns the kept lines of all pages and
+# how many were removed
+def dedupe_repeated_lines(pages):
+    edges = [_edges(lines) for lines in pages]
+    counts = Counter()
+    for lines, edge in zip(pages, edges):
+        counts.update({lines[i] for i in edge if len(lines[i].split()) <= _REPEAT_MAX_WORDS})
+    repeat_min = max(2, min(REPEAT_MIN, len(pages)))
+    seen = set()
+    kept = []
+    total = 0
+    for lines, edge in zip(pages, edges):
+        total += len(lines)
+        for i, line in enumerate(lines):
+            if _PAGE_LABEL.match(line) or (i in edge and _is_page_number(line, len(pages))):
+                continue
+            if i in edge and counts[line] >= repeat_min:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+    return kept, total - len(kept)
+
+
+# The section name for a heading line, or None for body text
+def section_of(line, kind):
+    if len(line) > 40:
+        return None
+    heading = re.sub(r"[^a-z' ]+", " ", line.lower().replace("&", " and ")).split()
+    return _SECTIONS[kind].get(" ".join(heading))
+
+
+# Split lines into [name, lines] sections; the preamble (contact details) has name None
+def split_sections(lines, kind):
+    sections = [[None, []]]
+    for line in lines:
+        name = section_of(line, kind) if line else None
+        if name is not None:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [section for section in sections if section[1]]
+
+
+def _tokens(lines):
+    return estimate_tokens("\n".join(lines))
+
+
+# Keep the first lines of a section that fit in budget tokens
+def _trim_lines(lines, budget):
+    kept = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            # Cut the first line that does not fit on a word boundary rather than dropping it
+            room = (budget - used) * 4
+            if room > 40:
+                kept.append(line[:room].rsplit(" ", 1)[0] + " " + _TRIMMED)
+            else:
+                kept.append(_TRIMMED)
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def _fit_sections(sections, budget, kind, result):
+    # Drop whole sections, least important first, until the text fits
+    for name in _PRIORITY[kind]:
+        if _tokens([line for _, lines in sections for line in lines]) <= budget:
+            return sections
+        remaining = [section for section in sections if section[0] != name]
+        if len(remaining) < len(sections) and remaining:
+            result.dropped_sections.append(name)
+            sections = remaining
+        if name == _PRIORITY[kind][len(_PRIORITY[kind]) // 2]:
+            break  # the more important half is trimmed, never dropped
+
+    # Share what is left evenly: small sections stay whole, large ones get trimmed
+    sizes = [_tokens(lines) + 1 for _, lines in sections]
+    if sum(sizes) <= budget:
+        return sections
+    allowance = {}
+    remaining_budget = budget
+    order = sorted(range(len(sections)), key=sizes.__getitem__)
+    for position, index in enumerate(order):
+        share = remaining_budget // (len(order) - position)
+        allowance[index] = min(sizes[index], share)
+        remaining_budget -= allowance[index]
+    trimmed = []
+    for index, (name, lines) in enumerate(sections):
+        if allowance[index] < sizes[index]:
+            lines = _trim_lines(lines, allowance[index])
+            result.trimmed_sections.append(name or "preamble")
+        trimmed.append([name, lines])
+    return trimmed
+
+
+@lru_cache(maxsize=64)
+def _compact(text, budget, kind):
+    original_tokens = estimate_tokens(text)
+    lines, removed = dedupe_repeated_lines(split_pages(text))
+    result = CompactText("", original_tokens, 0, removed)
+    if budget and _tokens(lines) > budget:
+        sections = _fit_sections(split_sections(lines, kind), budget, kind, result)
+        lines = [line for _, section_lines in sections for line in section_lines]
+    result.text = "\n".join(lines)
+    result.tokens = estimate_tokens(result.text)
+    return result
+
+
+# Compact resume ("resume") or job description ("job") text to about budget tokens
+# (0 only normalizes and de-duplicates). Returns a CompactText with the savings.
+def compact_text(text, budget=0, kind="resume"):
+    if kind not in _SECTIONS:
+        raise ValueError(f"Unknown text kind: {kind}")
+    text = text or ""
+    if not PROMPT_COMPACTION:
+        tokens = estimate_tokens(text)
+        return CompactText(text, tokens, tokens)
+    with span("prompt.compact", kind=kind) as record:
+        result = _compact(text, budget, kind)
+        record.set(original_tokens=result.original_tokens, tokens=result.tokens, saved_tokens=result.saved_tokens)
+    if result.saved_tokens:
+        logger.debug("Compacted %s text from %d to %d tokens (%d lines removed, dropped %s, trimmed %s)",
+                     kind, result.original_tokens, result.tokens, result.removed_lines,
+                     result.dropped_sections, result.trimmed_sections)
+    return result
+
+
+def compact_resume(resume_text, budget=PROMPT_RESUME_TOKENS):
+    return compact_text(resume_text, budget, "resume").text
+
+
+def compact_job_description(job_description, budget=PROMPT_JOB_TOKENS):
+    return compact_text(job_description, budget, "job").text
@@ -0,0 +1,167 @@
+import logging
+from dotenv import load_dotenv
+import GeminiClient
+from GeminiService import generate_text, display_text
+from LLMScheduler import PRIORITY_ANALYSIS, PRIORITY_CHAT
+from PdfExtract import extract_pdf_text, EXTRACT_OK, EXTRACT_FAILED
+from TextPipeline import analyze_text
+from PromptCompactor import compact_resume, compact_job_description, PROMPT_COURSES_TOKENS
+
+# Extraction, scoring and Gemini helpers shared by the Streamlit pages, with no UI
+# side effects on import. Heavy dependencies (pdfplumber, PyPDF2, scikit-learn,
+# matplotlib, the Gemini SDK) are imported the first time they are used.
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Function to extract text from PDF (a path, raw bytes/memoryview or a file-like upload).
+# Long documents are split into page ranges and extracted in a process pool.
+# on_status(status) is called when the PyPDF2 fallback was needed or extraction failed.
+def extract_text_from_pdf(pdf_source, workers=None, parallel_threshold=None, on_status=None):
+    text, status = extract_pdf_text(pdf_source, workers, parallel_threshold)
+    if status != EXTRACT_OK:
+        logger.warning("PDF extraction status: %s", status)
+        if on_status:
+            on_status(status)
+    if status == EXTRACT_FAILED:
+        return ""
+    return text
+
+# Function to analyze resume with Gemini AI (streams into on_chunk when given).
+# Both texts are compacted to their token budgets before they go into the prompt.
+def analyze_resume(resume_text, job_description=None, on_chunk=None, priority=PRIORITY_ANALYSIS):
+    if not resume_text:
+        return "Error: Resume text is required for analysis."
+    try:
+        resume_text = compact_resume(resume_text)
+        model = GeminiClient.get_model("gemini-1.5-flash")
+        base_prompt = f"""
+        You are an experienced HR professional. Analyze the following resume:
+        - Evaluate the candidate's suitability for a technical role.
+        - List strengths, weaknesses, and areas for improvement.
+        - Provide resume enhancement suggestions.
+        - Check for grammar and spelling mistakes.
+        Resume: {resume_text}
+        """
+        if job_description:
+            job_description = compact_job_description(job_description)
+            base_prompt += f"\n Compare with Job Description: {job_description}"
+        return display_text(generate_text(model, base_prompt, on_chunk, priority=priority))
+    except Exception as e:
+        return f"AI analysis failed: {e}"
+
+# Function to calculate match score against the corpus-fitted TF-IDF model
+# (observe=True also folds both texts into the saved IDF; by default that happens
+# only when MATCH_MODEL_LEARN is set)
+def calculate_match_score(resume_text, job_description, observe=None):
+    if not job_description:
+        return None
+    from MatchModel import MATCH_MODEL_LEARN, get_match_model, learn_documents
+
+    if MATCH_MODEL_LEARN if observe is None else observe:
+        learn_documents([resume_text, job_description])
+    match_score = get_match_model().similarity(resume_text, job_description) * 100
+    return round(match_score, 2)
+
+# Function to suggest courses based on missing skills (from a shorter compacted resume)
+def suggest_courses(resume_text, on_chunk=None, priority=PRIORITY_ANALYSIS):
+    resume_text = compact_resume(resume_text, PROMPT_COURSES_TOKENS)
+    model = GeminiClient.get_model("gemini-1.5-flash")
+    prompt = f"""
+    Based on the following resume, suggest a few relevant courses to improve missing skills:
+    Resume: {resume_text}
+    """
+    return display_text(generate_text(model, prompt, on_chunk, priority=priority))
+
+# Function to calculate ATS score based on keywords
+def calculate_ats_score(resume_text, job_description):
+    if not job_description:
+        return 0  # Return 0 if no job description is provided
+
+    # Extract keywords from job description
+    job_keywords = analyze_text(job_description).word_set  # Simple word extraction
+    resume_words = analyze_text(resume_text).word_set  # Extract words from resume
+
+    # Calculate the number of matching keywords
+    matching_keywords = job_keywords.intersection(resume_words)
+    ats_score = (len(matching_keywords) / len(job_keywords)) * 100 if job_keywords else 0  # Avoid division by zero
+
+    return round(ats_score, 2)  # Return ATS score rounded to 2 decimal places
+
+# Function to plot ATS score with improved visualization (a matplotlib figure;
+# the app itself renders the equivalent AtsGauge SVG)
+def plot_ats_score(ats_score):
+    import matplotlib.pyplot as plt
+
+    # Create figure with dark theme
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(8, 5), subplot_kw=dict(aspect="equal"))
+    
+    # Set background colors
+    ax.set_facecolor('#1E1E1E')
+    fig.patch.set_facecolor('#1E1E1E')
+    
+    # Calculate color based on score
+    if ats_score >= 80:
+        score_color = '#4CAF50'  # Green for high scores
+    elif ats_score >= 60:
+        score_color = '#FFA500'  # Orange for medium scores
+    else:
+        score_color = '#FF4444'  # Red for low scores
+    
+    # Create the gauge background (total range)
+    ax.pie([100], 
+           colors=['#333333'], 
+           startangle=90, 
+           counterclock=False,
+           wedgeprops=dict(width=0.3, edgecolor='none'))
+
+    # Create the actual score wedge
+    wedges, _ = ax.pie([ats_score, 100 - ats_score], 
+                       colors=[score_color, '#333333'], 
+                       startangle=90, 
+                       counterclock=False,
+                       wedgeprops=dict(width=0.3, edgecolor='none'))
+
+    # Add center circle for gauge effect
+    centre_circle = plt.Circle((0, 0), 0.70, fc='#1E1E1E', ec='none')
+    fig.gca().add_artist(centre_circle)
+
+    # Add score text in center
+    plt.text(0, 0.1, f"{int(ats_score)}", 
+             horizontalalignment='center', 
+             verticalalignment='center',
+             color='white', 
+             fontsize=30, 
+             fontweight='bold')
+    
+    # Add percentage symbol
+    plt.text(0, -0.1, "%", 
+             horizontalalignment='center', 
+             verticalalignment='center',
+             color='white', 
+             fontsize=20)
+
+    # Add "ATS Score" text
+    plt.text(0, -0.3, "ATS Parse Rate", 
+             horizontalalignment='center', 
+             color='#888888', 
+             fontsize=12)
+
+    # Set limits and remove axes
+    ax.set_xlim(-1.2, 1.2)
+    ax.set_ylim(-1.2, 1.2)
+    ax.axis('off')
+
+    # Add a subtle glow effect to the score wedge
+    wedges[0].set_alpha(0.9)
+
+    return fig
+
+# Chatbot for real-time assistant
+def get_ai_response(user_input, on_chunk=None):
+    model = GeminiClient.get_model("gemini-1.5-flash")
+    prompt = f"User: {user_input}\nAI:"
+    return display_text(generate_text(model, prompt, on_chunk, priority=PRIORITY_CHAT))
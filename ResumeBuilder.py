@@ -1,44 +1,160 @@
 import streamlit as st
-import json
-import os
+from ResumeStore import get_resume_store
+from MiniPdf import UnsupportedCharactersError
+from ResumeExport import MIME_TYPES, export_filename, render_docx, render_pdf
+
+# All sections share one form inside a fragment: typing never reruns anything, and
+# its single Generate Resume button submits every section at once, so nothing typed
+# is left behind. A submit reruns only the builder and its preview, not the whole
+# app. Streamlit versions without fragments fall back to a full rerun.
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+MAX_EXPERIENCES = 10
+MAX_EDUCATION = 5
+
+def empty_resume():
+    """Resume data with every field blank"""
+    return {
+        "personal_info": {
+            "full_name": "",
+            "email": "",
+            "phone": "",
+            "location": "",
+            "linkedin": "",
+            "portfolio": ""
+        },
+        "professional_summary": "",
+        "work_experience": [],
+        "education": [],
+        "skills": []
+    }
+
+# The resume as last generated in this session
+def get_draft():
+    if "rb_draft" not in st.session_state:
+        st.session_state.rb_draft = empty_resume()
+    return st.session_state.rb_draft
+
+def has_content(value):
+    """True when any field of the resume data is filled in"""
+    if isinstance(value, dict):
+        return any(has_content(item) for item in value.values())
+    if isinstance(value, list):
+        return any(has_content(item) for item in value)
+    return bool(str(value or "").strip())
 
 def main():
     st.title("📄 Resume Builder")
     st.write("Create your professional resume with our easy-to-use builder")
+    st.caption("Generate Resume saves every section and updates the preview.")
+    resume_builder()
+
+@_fragment
+def resume_builder():
+    draft = get_draft()
+    form_col, preview_col = st.columns([3, 2])
+
+    with form_col:
+        # Outside the form so the number of entries updates right away
+        col1, col2 = st.columns(2)
+        with col1:
+            num_experiences = st.number_input("Number of work experiences", min_value=0, max_value=MAX_EXPERIENCES,
+                                              value=len(draft["work_experience"]) or 1, key="rb_num_experiences")
+        with col2:
+            num_education = st.number_input("Number of educational qualifications", min_value=0,
+                                            max_value=MAX_EDUCATION, value=len(draft["education"]) or 1,
+                                            key="rb_num_education")
+
+        with st.form("rb_resume_form"):
+            personal_info = personal_info_section(draft["personal_info"])
+            summary = summary_section(draft["professional_summary"])
+            experiences = experience_section(draft["work_experience"], num_experiences)
+            education = education_section(draft["education"], num_education)
+            skills = skills_section(draft["skills"])
+            generate = st.form_submit_button("Generate Resume", type="primary")
+
+        if generate:
+            draft.update({
+                "personal_info": personal_info,
+                "professional_summary": summary,
+                "work_experience": experiences,
+                "education": education,
+                "skills": skills,
+            })
 
+    with preview_col:
+        st.header("Preview")
+        display_personal_info(draft["personal_info"])
+        display_summary(draft["professional_summary"])
+        display_experience(draft["work_experience"])
+        display_education(draft["education"])
+        display_skills(draft["skills"])
+
+    if generate:
+        if not has_content(draft):
+            st.warning("The resume is empty. Fill in at least one section before generating it.")
+            return
+        resume_data = {
+            "personal_info": dict(draft["personal_info"]),
+            "professional_summary": draft["professional_summary"],
+            "work_experience": [dict(exp) for exp in draft["work_experience"]],
+            "education": [dict(edu) for edu in draft["education"]],
+            "skills": list(draft["skills"])
+        }
+
+        # Save resume data; later saves in this session add revisions to the same resume
+        resume_id, revision = save_resume_data(resume_data, st.session_state.get("rb_resume_id"))
+        st.session_state.rb_resume_id = resume_id
+        st.success(f"Resume generated successfully! (saved as revision {revision})")
+        show_downloads(resume_id, resume_data)
+        display_resume(resume_data)
+
+# Each section renders its fields inside the shared form and returns their values
+def personal_info_section(info):
     # Personal Information
     st.header("Personal Information")
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        full_name = st.text_input("Full Name", key="rb_name")
-        email = st.text_input("Email", key="rb_email")
-        phone = st.text_input("Phone Number", key="rb_phone")
-        
+        full_name = st.text_input("Full Name", value=info["full_name"], key="rb_name")
+        email = st.text_input("Email", value=info["email"], key="rb_email")
+        phone = st.text_input("Phone Number", value=info["phone"], key="rb_phone")
+
     with col2:
-        location = st.text_input("Location", key="rb_location")
-        linkedin = st.text_input("LinkedIn URL", key="rb_linkedin")
-        portfolio = st.text_input("Portfolio URL", key="rb_portfolio")
+        location = st.text_input("Location", value=info["location"], key="rb_location")
+        linkedin = st.text_input("LinkedIn URL", value=info["linkedin"], key="rb_linkedin")
+        portfolio = st.text_input("Portfolio URL", value=info["portfolio"], key="rb_portfolio")
+
+    return {
+        "full_name": full_name,
+        "email": email,
+        "phone": phone,
+        "location": location,
+        "linkedin": linkedin,
+        "portfolio": portfolio
+    }
 
+def summary_section(summary):
     # Professional Summary
     st.header("Professional Summary")
-    summary = st.text_area("Write a brief professional summary")
+    return st.text_area("Write a brief professional summary", value=summary, key="rb_summary")
 
+def experience_section(saved, count):
     # Work Experience
     st.header("Work Experience")
-    num_experiences = st.number_input("Number of work experiences", min_value=0, max_value=10, value=1)
-    
     experiences = []
-    for i in range(num_experiences):
+    for i in range(count):
+        exp = saved[i] if i < len(saved) else {}
         st.subheader(f"Experience {i+1}")
         col1, col2 = st.columns(2)
         with col1:
-            company = st.text_input(f"Company Name #{i+1}")
-            position = st.text_input(f"Position #{i+1}")
+            company = st.text_input(f"Company Name #{i+1}", value=exp.get("company", ""), key=f"rb_company_{i}")
+            position = st.text_input(f"Position #{i+1}", value=exp.get("position", ""), key=f"rb_position_{i}")
         with col2:
-            start_date = st.text_input(f"Start Date #{i+1}")
-            end_date = st.text_input(f"End Date #{i+1}")
-        responsibilities = st.text_area(f"Key Responsibilities #{i+1}")
+            start_date = st.text_input(f"Start Date #{i+1}", value=exp.get("start_date", ""), key=f"rb_start_{i}")
+            end_date = st.text_input(f"End Date #{i+1}", value=exp.get("end_date", ""), key=f"rb_end_{i}")
+        responsibilities = st.text_area(f"Key Responsibilities #{i+1}", value=exp.get("responsibilities", ""),
+                                        key=f"rb_responsibilities_{i}")
         experiences.append({
             "company": company,
             "position": position,
@@ -46,94 +162,103 @@ def main():
             "end_date": end_date,
             "responsibilities": responsibilities
         })
+    return experiences
 
+def education_section(saved, count):
     # Education
     st.header("Education")
-    num_education = st.number_input("Number of educational qualifications", min_value=0, max_value=5, value=1)
-    
     education = []
-    for i in range(num_education):
+    for i in range(count):
+        edu = saved[i] if i < len(saved) else {}
         st.subheader(f"Education {i+1}")
         col1, col2 = st.columns(2)
         with col1:
-            institution = st.text_input(f"Institution #{i+1}")
-            degree = st.text_input(f"Degree #{i+1}")
+            institution = st.text_input(f"Institution #{i+1}", value=edu.get("institution", ""),
+                                        key=f"rb_institution_{i}")
+            degree = st.text_input(f"Degree #{i+1}", value=edu.get("degree", ""), key=f"rb_degree_{i}")
         with col2:
-            grad_year = st.text_input(f"Graduation Year #{i+1}")
-            gpa = st.text_input(f"GPA #{i+1}")
+            grad_year = st.text_input(f"Graduation Year #{i+1}", value=edu.get("graduation_year", ""),
+                                      key=f"rb_grad_year_{i}")
+            gpa = st.text_input(f"GPA #{i+1}", value=edu.get("gpa", ""), key=f"rb_gpa_{i}")
         education.append({
             "institution": institution,
             "degree": degree,
             "graduation_year": grad_year,
             "gpa": gpa
         })
+    return education
 
+def skills_section(skills):
     # Skills
     st.header("Skills")
-    skills = st.text_area("Enter your skills (one per line)")
+    text = st.text_area("Enter your skills (one per line)", value="\n".join(skills), key="rb_skills")
+    return [skill.strip() for skill in text.split("\n") if skill.strip()]
 
-    # Generate Resume
-    if st.button("Generate Resume"):
-        resume_data = {
-            "personal_info": {
-                "full_name": full_name,
-                "email": email,
-                "phone": phone,
-                "location": location,
-                "linkedin": linkedin,
-                "portfolio": portfolio
-            },
-            "professional_summary": summary,
-            "work_experience": experiences,
-            "education": education,
-            "skills": [skill.strip() for skill in skills.split("\n") if skill.strip()]
-        }
-        
-        # Save resume data
-        save_resume_data(resume_data)
-        st.success("Resume generated successfully!")
-        display_resume(resume_data)
+def save_resume_data(data, resume_id=None):
+    """Save resume data to the resume store; returns (resume_id, revision)"""
+    return get_resume_store().save(data, resume_id)
 
-def save_resume_data(data):
-    """Save resume data to a JSON file"""
-    os.makedirs("resumes", exist_ok=True)
-    with open(f"resumes/{data['personal_info']['full_name']}_resume.json", "w") as f:
-        json.dump(data, f, indent=4)
+def show_downloads(resume_id, data):
+    """Offer the resume as DOCX and PDF files"""
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Download DOCX", render_docx(data), file_name=export_filename(resume_id, data, "docx"),
+                           mime=MIME_TYPES["docx"], key="rb_download_docx")
+    with col2:
+        try:
+            pdf = render_pdf(data)
+        except UnsupportedCharactersError as e:
+            # Never hand out a PDF with characters silently dropped
+            st.warning(f"PDF export is unavailable: no installed font can show \"{e.characters}\". "
+                       "Download the DOCX, or set RESUME_PDF_FONTS to a TrueType font that has them.")
+        else:
+            st.download_button("⬇️ Download PDF", pdf, file_name=export_filename(resume_id, data, "pdf"),
+                               mime=MIME_TYPES["pdf"], key="rb_download_pdf")
 
-def display_resume(data):
-    """Display the generated resume"""
-    st.markdown("---")
-    st.header("Generated Resume")
-    
-    # Personal Information
-    st.subheader(data["personal_info"]["full_name"])
-    st.write(f"📧 {data['personal_info']['email']} | 📱 {data['personal_info']['phone']}")
-    st.write(f"📍 {data['personal_info']['location']}")
-    if data["personal_info"]["linkedin"]:
-        st.write(f"LinkedIn: {data['personal_info']['linkedin']}")
-    if data["personal_info"]["portfolio"]:
-        st.write(f"Portfolio: {data['personal_info']['portfolio']}")
-    
-    # Professional Summary
+def display_personal_info(info):
+    """Display the name and contact details"""
+    st.subheader(info["full_name"] or "Your Name")
+    st.write(f"📧 {info['email']} | 📱 {info['phone']}")
+    st.write(f"📍 {info['location']}")
+    if info["linkedin"]:
+        st.write(f"LinkedIn: {info['linkedin']}")
+    if info["portfolio"]:
+        st.write(f"Portfolio: {info['portfolio']}")
+
+def display_summary(summary):
+    """Display the professional summary"""
     st.markdown("### Professional Summary")
-    st.write(data["professional_summary"])
-    
-    # Work Experience
+    st.write(summary)
+
+def display_experience(experiences):
+    """Display the work experience entries"""
     st.markdown("### Work Experience")
-    for exp in data["work_experience"]:
+    for exp in experiences:
         st.markdown(f"**{exp['position']} at {exp['company']}**")
         st.write(f"{exp['start_date']} - {exp['end_date']}")
         st.write(exp["responsibilities"])
-    
-    # Education
+
+def display_education(education):
+    """Display the education entries"""
     st.markdown("### Education")
-    for edu in data["education"]:
+    for edu in education:
         st.markdown(f"**{edu['degree']} - {edu['institution']}**")
         st.write(f"Graduated: {edu['graduation_year']} | GPA: {edu['gpa']}")
-    
-    # Skills
+
+def display_skills(skills):
+    """Display the skills list"""
     st.markdown("### Skills")
-    st.write(" • ".join(data["skills"]))
+    st.write(" • ".join(skills))
+
+def display_resume(data):
+    """Display the generated resume"""
+    st.markdown("---")
+    st.header("Generated Resume")
+    display_personal_info(data["personal_info"])
+    display_summary(data["professional_summary"])
+    display_experience(data["work_experience"])
+    display_education(data["education"])
+    display_skills(data["skills"])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
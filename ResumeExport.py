@@ -0,0 +1,368 @@
+import argparse
+import io
+import logging
+import multiprocessing
+import os
+import re
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from xml.sax.saxutils import escape
+from dotenv import load_dotenv
+import MiniPdf
+
+# Load environment variables
+load_dotenv()
+
+# DOCX and PDF export of Resume Builder data. Both formats render the same list of
+# layout blocks. The DOCX template is parsed once per process: its package parts are
+# compressed once and kept, and only word/document.xml is generated per resume, so an
+# export costs one small deflate instead of a python-docx document build.
+RESUME_DOCX_TEMPLATE = os.getenv("RESUME_DOCX_TEMPLATE", "")
+RESUME_EXPORT_WORKERS = int(os.getenv("RESUME_EXPORT_WORKERS", "0"))
+# TrueType fonts (os.pathsep-separated, tried in order) for PDF text the built-in
+# Helvetica cannot show; by default the fonts-dejavu-core and fonts-droid-fallback ones
+RESUME_PDF_FONTS = os.getenv("RESUME_PDF_FONTS", "")
+_DEFAULT_PDF_FONTS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("docx", "pdf")
+MIME_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+# Resumes sent to a worker per task during bulk export
+_BULK_CHUNK = 32
+# Template paragraph replaced by the resume; without it the resume fills the whole body
+_PLACEHOLDER = "{{resume}}"
+_DOCUMENT_PART = "word/document.xml"
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Block kinds and the template style names they use
+_STYLES = {
+    "title": "Title",
+    "heading": "Heading 1",
+    "subheading": "Heading 2",
+    "bullet": "List Bullet",
+    "text": "Normal",
+    "contact": "Normal",
+}
+
+_template = None
+_template_lock = threading.Lock()
+
+
+# Layout shared by both formats: a list of (kind, text) blocks
+def resume_blocks(data):
+    info = data.get("personal_info") or {}
+    blocks = [("title", info.get("full_name") or "Resume")]
+    contact = " | ".join(value for value in (info.get("email"), info.get("phone"), info.get("location")) if value)
+    if contact:
+        blocks.append(("contact", contact))
+    if info.get("linkedin"):
+        blocks.append(("contact", f"LinkedIn: {info['linkedin']}"))
+    if info.get("portfolio"):
+        blocks.append(("contact", f"Portfolio: {info['portfolio']}"))
+
+    summary = (data.get("professional_summary") or "").strip()
+    if summary:
+        blocks.append(("heading", "Professional Summary"))
+        blocks.extend(("text", line) for line in summary.splitlines() if line.strip())
+
+    experiences = [exp for exp in data.get("work_experience") or [] if any(exp.values())]
+    if experiences:
+        blocks.append(("heading", "Work Experience"))
+        for exp in experiences:
+            title = " at ".join(value for value in (exp.get("position"), exp.get("company")) if value)
+            blocks.append(("subheading", title))
+            dates = " - ".join(value for value in (exp.get("start_date"), exp.get("end_date")) if value)
+            if dates:
+                blocks.append(("text", dates))
+            for line in (exp.get("responsibilities") or "").splitlines():
+                line = line.strip().lstrip("-•*").strip()
+                if line:
+                    blocks.append(("bullet", line))
+
+    education = [edu for edu in data.get("education") or [] if any(edu.values())]
+    if education:
+        blocks.append(("heading", "Education"))
+        for edu in education:
+            blocks.append(("subheading", " - ".join(value for value in (edu.get("degree"), edu.get("institution")) if value)))
+            details = [f"Graduated: {edu['graduation_year']}" if edu.get("graduation_year") else "",
+                       f"GPA: {edu['gpa']}" if edu.get("gpa") else ""]
+            if any(details):
+                blocks.append(("text", " | ".join(detail for detail in details if detail)))
+
+    skills = data.get("skills") or []
+    if skills:
+        blocks.append(("heading", "Skills"))
+        blocks.append(("text", " • ".join(skills)))
+    return blocks
+
+
+# Parsed DOCX template: the package parts except the body, plus the body split
+# around the insertion point and the style ids of the block styles
+class DocxTemplate:
+    def __init__(self, path=None):
+        import docx
+
+        if path:
+            with open(path, "rb") as f:
+                package = f.read()
+        else:
+            buffer = io.BytesIO()
+            docx.Document().save(buffer)
+            package = buffer.getvalue()
+        document = docx.Document(io.BytesIO(package))
+        self.style_ids = {}
+        for kind, name in _STYLES.items():
+            try:
+                self.style_ids[kind] = document.styles[name].style_id
+            except KeyError:
+                self.style_ids[kind] = None
+
+        self.entries = []
+        with zipfile.ZipFile(io.BytesIO(package)) as archive:
+            for item in archive.infolist():
+                if item.filename == _DOCUMENT_PART:
+                    xml = archive.read(item).decode("utf-8")
+                else:
+                    self.entries.append(_ZipEntry(item.filename, archive.read(item)))
+        # [Content_Types].xml is conventionally the first entry of the package
+        self.entries.sort(key=lambda entry: entry.name != b"[Content_Types].xml")
+        self.prefix, self.suffix = self._split_body(xml)
+
+    @staticmethod
+    def _split_body(xml):
+        marker = xml.find(_PLACEHOLDER)
+        if marker != -1:
+            start = xml.rfind("<w:p>", 0, marker)
+            start = max(start, xml.rfind("<w:p ", 0, marker))
+            end = xml.find("</w:p>", marker) + len("</w:p>")
+            return xml[:start], xml[end:]
+        body_start = xml.find(">", xml.find("<w:body")) + 1
+        section = xml.rfind("<w:sectPr", body_start)
+        body_end = section if section != -1 else xml.rfind("</w:body>")
+        return xml[:body_start], xml[body_end:]
+
+    def _paragraph(self, kind, text):
+        text = escape(_INVALID_XML.sub("", text))
+        style = self.style_ids.get(kind)
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        run_properties = "<w:rPr><w:b/></w:rPr>" if kind == "subheading" and not style else ""
+        return f'<w:p>{properties}<w:r>{run_properties}<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+    def render(self, blocks):
+        body = "".join(self._paragraph(kind, text) for kind, text in blocks)
+        document = _ZipEntry(_DOCUMENT_PART, (self.prefix + body + self.suffix).encode("utf-8"))
+        return _write_zip(self.entries[:1] + [document] + self.entries[1:])
+
+
+# A deflated zip member, compressed once and reusable across archives
+class _ZipEntry:
+    __slots__ = ("name", "crc", "size", "data")
+
+    def __init__(self, name, content):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        self.name = name.encode("utf-8")
+        self.crc = zlib.crc32(content)
+        self.size = len(content)
+        self.data = compressor.compress(content) + compressor.flush()
+
+
+# Assemble a zip archive from already-compressed entries (zipfile would recompress
+# the unchanged template parts for every resume)
+def _write_zip(entries):
+    out = bytearray()
+    directory = bytearray()
+    for entry in entries:
+        offset = len(out)
+        # Fixed timestamp: 1980-01-01 00:00
+        out += struct.pack("<4s5H3I2H", b"PK\x03\x04", 20, 0, 8, 0, 33,
+                           entry.crc, len(entry.data), entry.size, len(entry.name), 0)
+        out += entry.name
+        out += entry.data
+        directory += struct.pack("<4s6H3I5H2I", b"PK\x01\x02", 20, 20, 0, 8, 0, 33,
+                                 entry.crc, len(entry.data), entry.size, len(entry.name), 0, 0, 0, 0, 0, offset)
+        directory += entry.name
+    out += directory
+    out += struct.pack("<4s4H2IH", b"PK\x05\x06", 0, 0, len(entries), len(entries),
+                       len(directory), len(out) - len(directory), 0)
+    return bytes(out)
+
+
+# Template loaded once per process (RESUME_DOCX_TEMPLATE, or python-docx's default)
+def get_docx_template():
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = DocxTemplate(RESUME_DOCX_TEMPLATE or None)
+    return _template
+
+
+def render_docx(data):
+    """Return the resume as DOCX bytes"""
+    return get_docx_template().render(resume_blocks(data))
+
+
+_PDF_STYLES = {
+    "title": (18, True),
+    "heading": (13, True),
+    "subheading": (11, True),
+    "bullet": (10, False),
+    "text": (10, False),
+    "contact": (9, False),
+}
+
+
+# Embeddable fonts that exist on this machine; unusable files are logged and skipped
+def pdf_fonts():
+    paths = [path for path in RESUME_PDF_FONTS.split(os.pathsep) if path] or _DEFAULT_PDF_FONTS
+    fonts = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            fonts.append(MiniPdf.load_font(path))
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Cannot use %s for PDF export: %s", path, e)
+    return fonts
+
+
+def render_pdf(data):
+    """Return the resume as PDF bytes; raises MiniPdf.UnsupportedCharactersError when
+    no available font can show part of the text"""
+    blocks = resume_blocks(data)
+    lines = []
+    for kind, text in blocks:
+        size, bold = _PDF_STYLES[kind]
+        if kind == "heading" and lines:
+            lines.append(("", 6, False))
+        lines.extend(MiniPdf.wrap_text(f"• {text}" if kind == "bullet" else text, size, bold))
+    # Fonts are only loaded for resumes Helvetica cannot show on its own
+    fonts = () if MiniPdf.is_winansi("".join(text for _, text in blocks)) else pdf_fonts()
+    return MiniPdf.build_pdf(MiniPdf.paginate(lines), fonts=fonts)
+
+
+_RENDERERS = {"docx": render_docx, "pdf": render_pdf}
+
+
+def export_resume(data, fmt):
+    """Render one resume in the given format ("docx" or "pdf")"""
+    return _RENDERERS[fmt](data)
+
+
+# File name for an exported resume: the person's name plus the full id, so two
+# resumes with the same name never share an entry in a bulk export zip
+def export_filename(resume_id, data, fmt):
+    name = (data.get("personal_info") or {}).get("full_name") or "resume"
+    name = re.sub(r"[^\w.-]+", "_", name).strip("_") or "resume"
+    resume_id = re.sub(r"[^\w.-]+", "_", str(resume_id))
+    return f"{name}_{resume_id}.{fmt}"
+
+
+# Worker task: render a chunk of (resume_id, data) pairs into (filename, bytes) pairs,
+# plus (filename, reason) for files that could not be rendered
+def _render_chunk(chunk, formats):
+    files = []
+    skipped = []
+    for resume_id, data in chunk:
+        for fmt in formats:
+            name = export_filename(resume_id, data, fmt)
+            try:
+                files.append((name, export_resume(data, fmt)))
+            except MiniPdf.UnsupportedCharactersError as e:
+                skipped.append((name, str(e)))
+    return len(chunk), files, skipped
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Export (resume_id, data) records into a zip, rendering chunks in a process pool.
+# At most two chunks per worker are in flight, so memory stays flat however many
+# resumes are exported; results are written to the zip as soon as they complete.
+def export_bulk(records, output, formats=FORMATS, workers=None, chunk_size=_BULK_CHUNK):
+    """Write every record to the zip output (path or binary file); returns throughput stats"""
+    workers = workers or RESUME_EXPORT_WORKERS or os.cpu_count() or 1
+    formats = tuple(formats)
+    started = time.perf_counter()
+    exported = files = 0
+    skipped = []
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:
+        def write(result):
+            nonlocal exported, files
+            count, rendered, failed = result
+            skipped.extend(failed)
+            for name, content in rendered:
+                # DOCX files are already deflated; PDF content streams are plain text
+                compress = zipfile.ZIP_STORED if name.endswith(".docx") else zipfile.ZIP_DEFLATED
+                archive.writestr(name, content, compress_type=compress)
+            exported += count
+            files += len(rendered)
+
+        if workers <= 1:
+            for chunk in _chunks(records, chunk_size):
+                write(_render_chunk(chunk, formats))
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                pending = set()
+                for chunk in _chunks(records, chunk_size):
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write(future.result())
+                    pending.add(pool.submit(_render_chunk, chunk, formats))
+                for future in pending:
+                    write(future.result())
+
+    seconds = time.perf_counter() - started
+    return {
+        "resumes": exported,
+        "files": files,
+        "skipped": skipped,
+        "seconds": round(seconds, 3),
+        "resumes_per_second": round(exported / seconds, 1) if seconds else None,
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored resumes to DOCX/PDF in a zip file")
+    parser.add_argument("output", help="zip file to write")
+    parser.add_argument("--store", help="resume store path (default: RESUME_STORE_PATH)")
+    parser.add_argument("--format", action="append", choices=FORMATS, help="formats to export (default: both)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    from ResumeStore import ResumeStore, RESUME_STORE_PATH
+
+    store = ResumeStore(args.store or RESUME_STORE_PATH)
+    stats = export_bulk(store.iter_latest(), args.output, args.format or FORMATS, args.workers or None)
+    print(f"Exported {stats['resumes']} resumes ({stats['files']} files) in {stats['seconds']} s: "
+          f"{stats['resumes_per_second']} resumes/s with {stats['workers']} workers")
+    for name, reason in stats["skipped"]:
+        print(f"Skipped {name}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dotenv import load_dotenv
+from TextPipeline import analyze_text
+
+# Load environment variables
+load_dotenv()
+
+# On-disk BM25 inverted index over stored resumes, for top-k retrieval against a
+# job description. Postings live in SQLite (one sorted blob per term) and are
+# decoded into NumPy arrays on first use in each process.
+RESUME_INDEX_PATH = os.getenv("RESUME_INDEX_PATH", ".cache/resume_index.sqlite3")
+RESUME_INDEX_TERM_CACHE = int(os.getenv("RESUME_INDEX_TERM_CACHE", "50000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    external_id TEXT NOT NULL,
+    source TEXT,
+    length INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_external_id ON docs (external_id, deleted);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT PRIMARY KEY,
+    doc_ids BLOB NOT NULL,
+    tfs BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+# Lowercased term frequencies of a document. Bulk indexing skips the shared
+# document cache so it does not evict the documents the app is scoring.
+def term_counts(text, cache=True):
+    return analyze_text(text, cache=cache).term_counts
+
+
+class ResumeIndex:
+    def __init__(self, path=RESUME_INDEX_PATH, k1=1.2, b=0.75, term_cache_size=RESUME_INDEX_TERM_CACHE):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.term_cache_size = term_cache_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._generation = None
+        self._terms = OrderedDict()
+        self._doc_norm = None
+        self._live = None
+        self._external_ids = None
+        self._sources = None
+        self._n_docs = 0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _meta(conn, key, default=0):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # Tombstone the live copies of external_id; returns (documents, tokens) removed
+    def _delete_live(self, conn, external_id):
+        rows = conn.execute(
+            "SELECT doc_id, length FROM docs WHERE external_id = ? AND deleted = 0", (external_id,)).fetchall()
+        for doc_id, _ in rows:
+            conn.execute("UPDATE docs SET deleted = 1 WHERE doc_id = ?", (doc_id,))
+        return len(rows), sum(length for _, length in rows)
+
+    def _update_totals(self, conn, docs_delta, length_delta):
+        self._set_meta(conn, "n_docs", self._meta(conn, "n_docs") + docs_delta)
+        self._set_meta(conn, "total_length", self._meta(conn, "total_length") + length_delta)
+        self._set_meta(conn, "generation", self._meta(conn, "generation") + 1)
+
+    def add_documents(self, documents):
+        """Index (external_id, text[, source]) tuples; re-adding an id replaces it"""
+        import numpy as np
+
+        conn = self._connect()
+        added = 0
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                new_ids = defaultdict(list)
+                new_tfs = defaultdict(list)
+                now = time.time()
+                docs_delta = length_delta = 0
+                for document in documents:
+                    external_id, text = document[0], document[1]
+                    source = document[2] if len(document) > 2 else None
+                    removed_docs, removed_length = self._delete_live(conn, str(external_id))
+                    counts = term_counts(text, cache=False)
+                    length = sum(counts.values())
+                    doc_id = conn.execute(
+                        "INSERT INTO docs (external_id, source, length, added_at) VALUES (?, ?, ?, ?)",
+                        (str(external_id), source, length, now)).lastrowid
+                    for term, tf in counts.items():
+                        new_ids[term].append(doc_id)
+                        new_tfs[term].append(tf)
+                    docs_delta += 1 - removed_docs
+                    length_delta += length - removed_length
+                    added += 1
+
+                # Doc ids only grow, so appending keeps every posting list sorted
+                for term, id_list in new_ids.items():
+                    ids = np.array(id_list, dtype=np.int32)
+                    tfs = np.minimum(np.array(new_tfs[term], dtype=np.int64), 65535).astype(np.uint16)
+                    row = conn.execute("SELECT doc_ids, tfs FROM postings WHERE term = ?", (term,)).fetchone()
+                    if row:
+                        ids_blob = row[0] + ids.tobytes()
+                        tfs_blob = row[1] + tfs.tobytes()
+                    else:
+                        ids_blob, tfs_blob = ids.tobytes(), tfs.tobytes()
+                    conn.execute("INSERT OR REPLACE INTO postings (term, doc_ids, tfs) VALUES (?, ?, ?)",
+                                 (term, ids_blob, tfs_blob))
+                self._update_totals(conn, docs_delta, length_delta)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def add_document(self, external_id, text, source=None):
+        return self.add_documents([(external_id, text, source)])
+
+    def delete_document(self, external_id):
+        """Tombstone a document; its postings are dropped by compact()"""
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed_docs, removed_length = self._delete_live(conn, str(external_id))
+                if removed_docs:
+                    self._update_totals(conn, -removed_docs, -removed_length)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return bool(removed_docs)
+
+    def compact(self):
+        """Rewrite posting lists without tombstoned documents"""
+        import numpy as np
+
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                dead = np.array([row[0] for row in conn.execute("SELECT doc_id FROM docs WHERE deleted = 1")],
+                                dtype=np.int32)
+                if len(dead):
+                    for term, ids_blob, tfs_blob in conn.execute("SELECT term, doc_ids, tfs FROM postings").fetchall():
+                        ids = np.frombuffer(ids_blob, dtype=np.int32)
+                        keep = ~np.isin(ids, dead, assume_unique=True)
+                        if keep.all():
+                            continue
+                        if not keep.any():
+                            conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+                            continue
+                        tfs = np.frombuffer(tfs_blob, dtype=np.uint16)
+                        conn.execute("UPDATE postings SET doc_ids = ?, tfs = ? WHERE term = ?",
+                                     (ids[keep].tobytes(), tfs[keep].tobytes(), term))
+                    conn.execute("DELETE FROM docs WHERE deleted = 1")
+                    self._set_meta(conn, "generation", self._meta(conn, "generation") + 1)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if len(dead):
+            conn.execute("VACUUM")
+
+    # Reload per-document arrays when another writer changed the index
+    def _sync(self, conn):
+        import numpy as np
+
+        generation = self._meta(conn, "generation")
+        if generation == self._generation:
+            return
+        rows = conn.execute("SELECT doc_id, external_id, source, length, deleted FROM docs").fetchall()
+        size = (max(row[0] for row in rows) + 1) if rows else 1
+        lengths = np.zeros(size, dtype=np.float64)
+        live = np.zeros(size, dtype=np.float32)
+        external_ids = [None] * size
+        sources = [None] * size
+        for doc_id, external_id, source, length, deleted in rows:
+            lengths[doc_id] = length
+            live[doc_id] = 0.0 if deleted else 1.0
+            external_ids[doc_id] = external_id
+            sources[doc_id] = source
+        n_docs = int(live.sum())
+        avgdl = (float(lengths[live > 0].sum()) / n_docs) if n_docs else 1.0
+        self._doc_norm = self.k1 * (1.0 - self.b + self.b * lengths / max(avgdl, 1e-9))
+        self._live = live
+        self._external_ids = external_ids
+        self._sources = sources
+        self._n_docs = n_docs
+        self._terms.clear()
+        self._generation = generation
+
+    # Posting list of a term with precomputed BM25 contributions and their upper bound
+    def _term(self, conn, term):
+        import numpy as np
+
+        cached = self._terms.get(term)
+        if cached is not None:
+            self._terms.move_to_end(term)
+            return cached
+        row = conn.execute("SELECT doc_ids, tfs FROM postings WHERE term = ?", (term,)).fetchone()
+        if row is None:
+            cached = None
+        else:
+            ids = np.frombuffer(row[0], dtype=np.int32)
+            tfs = np.frombuffer(row[1], dtype=np.uint16).astype(np.float32)
+            live = self._live[ids]
+            df = float(live.sum())
+            if df == 0:
+                cached = None
+            else:
+                idf = np.log(1.0 + (self._n_docs - df + 0.5) / (df + 0.5))
+                contrib = (idf * tfs * (self.k1 + 1.0) / (tfs + self._doc_norm[ids])).astype(np.float32) * live
+                cached = (ids, contrib, float(contrib.max()))
+        self._terms[term] = cached
+        while len(self._terms) > self.term_cache_size:
+            self._terms.popitem(last=False)
+        return cached
+
+    def search(self, query, k=50):
+        """Return the top-k documents for a query as dicts of id, score and source"""
+        import numpy as np
+
+        conn = self._connect()
+        with self._read_lock:
+            # Docs and postings are read in one snapshot, so documents another process
+            # adds meanwhile cannot show up in postings without their doc rows
+            conn.execute("BEGIN")
+            try:
+                self._sync(conn)
+                terms = []
+                if self._n_docs and k > 0:
+                    terms = [t for t in (self._term(conn, term) for term in term_counts(query)) if t is not None]
+            finally:
+                conn.execute("COMMIT")
+            if not terms:
+                return []
+
+            # MaxScore (WAND family) term-at-a-time: take terms by decreasing upper bound.
+            # Once the bounds of the unprocessed terms cannot lift an unseen document
+            # above the current k-th score, only surviving candidates are scored.
+            terms.sort(key=lambda t: t[2], reverse=True)
+            remaining = float(sum(t[2] for t in terms))
+            scores = np.zeros(len(self._live), dtype=np.float32)
+            touched = np.zeros(len(self._live), dtype=bool)
+            best = 0.0
+            candidates = None
+            for ids, contrib, upper in terms:
+                remaining -= upper
+                if candidates is None:
+                    scores[ids] += contrib
+                    touched[ids] = True
+                    best = max(best, float(scores[ids].max()))
+                    # The k-th score is at most the best score, so skip the partition until it can matter
+                    if remaining >= best:
+                        continue
+                    touched_ids = np.flatnonzero(touched)
+                    if len(touched_ids) >= k:
+                        threshold = np.partition(scores[touched_ids], -k)[-k]
+                        if remaining < threshold:
+                            keep = scores[touched_ids] + remaining >= threshold
+                            candidates = touched_ids[keep]
+                elif len(candidates) * 16 < len(ids):
+                    # Few candidates: binary-search them in the sorted posting list
+                    positions = np.searchsorted(ids, candidates)
+                    positions[positions >= len(ids)] = 0
+                    hit = ids[positions] == candidates
+                    scores[candidates[hit]] += contrib[positions[hit]]
+                else:
+                    # Many candidates: a membership mask over the posting list is cheaper
+                    member = np.zeros(len(scores), dtype=bool)
+                    member[candidates] = True
+                    hit = member[ids]
+                    scores[ids[hit]] += contrib[hit]
+                if candidates is not None:
+                    threshold = np.partition(scores[candidates], -k)[-k] if len(candidates) > k else 0.0
+                    candidates = candidates[scores[candidates] + remaining >= threshold]
+
+            pool = np.flatnonzero(touched & (self._live > 0)) if candidates is None else candidates
+            pool = pool[scores[pool] > 0]
+            if len(pool) > k:
+                pool = pool[np.argpartition(scores[pool], -k)[-k:]]
+            pool = pool[np.argsort(-scores[pool], kind="stable")]
+            return [{"id": self._external_ids[doc_id], "score": round(float(scores[doc_id]), 4),
+                     "source": self._sources[doc_id]} for doc_id in pool]
+
+    def __len__(self):
+        return int(self._meta(self._connect(), "n_docs"))
+
+    def stats(self):
+        conn = self._connect()
+        n_docs = int(self._meta(conn, "n_docs"))
+        return {
+            "documents": n_docs,
+            "terms": conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0],
+            "tombstones": conn.execute("SELECT COUNT(*) FROM docs WHERE deleted = 1").fetchone()[0],
+            "avg_length": round(self._meta(conn, "total_length") / n_docs, 2) if n_docs else 0,
+        }
+
+    def index_resume_json_dir(self, directory="resumes"):
+        """Index the JSON files written by ResumeBuilder.save_resume_data"""
+        from MatchModel import resume_json_text
+
+        documents = []
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if name.endswith(".json"):
+                path = os.path.join(directory, name)
+                with open(path, encoding="utf-8") as f:
+                    documents.append((name[:-len(".json")], resume_json_text(json.load(f)), path))
+        return self.add_documents(documents)
+
+    def index_resume_store(self, store=None):
+        """Index the latest revision of every resume in the Resume Builder store"""
+        from MatchModel import resume_json_text
+        from ResumeStore import get_resume_store
+
+        store = store or get_resume_store()
+        return self.add_documents((resume_id, resume_json_text(data), "store")
+                                  for resume_id, data in store.iter_latest())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage and query the BM25 resume index")
+    parser.add_argument("--index", default=RESUME_INDEX_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index .txt, .pdf and Resume Builder .json files")
+    add.add_argument("paths", nargs="+")
+    search = commands.add_parser("search", help="top-k resumes for a job description")
+    search.add_argument("query", help="job description text, or @path to read it from a file")
+    search.add_argument("-k", type=int, default=50)
+    delete = commands.add_parser("delete")
+    delete.add_argument("ids", nargs="+")
+    commands.add_parser("compact")
+    commands.add_parser("stats")
+    args = parser.parse_args()
+
+    index = ResumeIndex(args.index)
+    if args.command == "add":
+        from MatchModel import read_document
+
+        paths = []
+        for pattern in args.paths:
+            paths.extend(sorted(glob.glob(os.path.join(pattern, "**", "*"), recursive=True))
+                         if os.path.isdir(pattern) else sorted(glob.glob(pattern)))
+        paths = [p for p in paths if os.path.splitext(p)[1].lower() in (".txt", ".json", ".pdf")]
+        # Each file is read by its own path; re-globbing names with [, * or ? would miss them
+        documents = [(os.path.splitext(os.path.basename(p))[0], read_document(p), p) for p in paths]
+        print(f"Indexed {index.add_documents(documents)} documents")
+    elif args.command == "search":
+        query = args.query
+        if query.startswith("@"):
+            with open(query[1:], encoding="utf-8") as f:
+                query = f.read()
+        start = time.perf_counter()
+        hits = index.search(query, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        for rank, hit in enumerate(hits, 1):
+            print(f"{rank:3d}. {hit['score']:8.3f}  {hit['id']}  {hit['source'] or ''}")
+        print(f"{len(hits)} results in {elapsed:.1f} ms")
+    elif args.command == "delete":
+        for external_id in args.ids:
+            print(f"{external_id}: {'deleted' if index.delete_document(external_id) else 'not found'}")
+    elif args.command == "compact":
+        index.compact()
+    else:
+        print(json.dumps(index.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Storage for Resume Builder output. Every save is kept as a numbered revision; the
+# latest revision is denormalized into the resumes table with indexed email, name and
+# skill lookups, so listing and filtering never parse the stored JSON.
+RESUME_STORE_PATH = os.getenv("RESUME_STORE_PATH", "resumes/resumes.sqlite3")
+
+# Resumes written per transaction during bulk imports
+_IMPORT_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    email TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_email ON resumes (email);
+CREATE INDEX IF NOT EXISTS resumes_name_key ON resumes (name_key);
+CREATE INDEX IF NOT EXISTS resumes_updated_at ON resumes (updated_at);
+CREATE TABLE IF NOT EXISTS revisions (
+    resume_id TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resume_id, revision)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS skills (
+    skill TEXT NOT NULL,
+    resume_id TEXT NOT NULL,
+    PRIMARY KEY (skill, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS skills_resume_id ON skills (resume_id);
+"""
+
+_SUMMARY_COLUMNS = "resume_id, full_name, email, revision, created_at, updated_at"
+
+
+def _name_key(name):
+    return " ".join((name or "").split()).casefold()
+
+
+def _email_key(email):
+    return (email or "").strip().lower()
+
+
+def _skill_key(skill):
+    return " ".join(str(skill).split()).casefold()
+
+
+def _personal_info(data):
+    info = data.get("personal_info") or {}
+    return info.get("full_name") or "", info.get("email") or ""
+
+
+def _skill_keys(data):
+    return sorted({_skill_key(skill) for skill in data.get("skills") or [] if _skill_key(skill)})
+
+
+def _summary(row):
+    return dict(zip(("id", "full_name", "email", "revision", "created_at", "updated_at"), row))
+
+
+class ResumeStore:
+    def __init__(self, path=RESUME_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # Resolve which resume a save without an explicit id revises: the one with the same email
+    @staticmethod
+    def _existing_id(conn, email):
+        if not email:
+            return None
+        rows = conn.execute("SELECT resume_id FROM resumes WHERE email = ? LIMIT 2", (email,)).fetchall()
+        return rows[0][0] if len(rows) == 1 else None
+
+    def _write(self, conn, resume_id, data, now):
+        full_name, email = _personal_info(data)
+        email = _email_key(email)
+        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        row = conn.execute("SELECT revision, data FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        if row is not None and row[1] == payload:
+            return row[0]  # unchanged; no new revision
+        revision = row[0] + 1 if row is not None else 1
+        conn.execute("INSERT INTO revisions (resume_id, revision, created_at, data) VALUES (?, ?, ?, ?)",
+                     (resume_id, revision, now, payload))
+        if row is None:
+            conn.execute(
+                "INSERT INTO resumes (resume_id, full_name, name_key, email, revision, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (resume_id, full_name, _name_key(full_name), email, revision, now, now, payload))
+        else:
+            conn.execute(
+                "UPDATE resumes SET full_name = ?, name_key = ?, email = ?, revision = ?, updated_at = ?, data = ? "
+                "WHERE resume_id = ?",
+                (full_name, _name_key(full_name), email, revision, now, payload, resume_id))
+            conn.execute("DELETE FROM skills WHERE resume_id = ?", (resume_id,))
+        conn.executemany("INSERT INTO skills (skill, resume_id) VALUES (?, ?)",
+                         [(skill, resume_id) for skill in _skill_keys(data)])
+        return revision
+
+    # Without resume_id a new resume is always created: the email is typed by whoever
+    # uses the builder, so it must never select someone else's resume to overwrite
+    def save(self, data, resume_id=None):
+        """Store data as a new revision; returns (resume_id, revision)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if resume_id is None:
+                resume_id = uuid.uuid4().hex
+            revision = self._write(conn, resume_id, data, time.time())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return resume_id, revision
+
+    def get(self, resume_id, revision=None):
+        """Return the latest (or a specific) revision of a resume, or None"""
+        conn = self._connect()
+        if revision is None:
+            row = conn.execute("SELECT data FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        else:
+            row = conn.execute("SELECT data FROM revisions WHERE resume_id = ? AND revision = ?",
+                               (resume_id, revision)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def revisions(self, resume_id):
+        """Return [(revision, created_at)] for a resume, oldest first"""
+        return self._connect().execute(
+            "SELECT revision, created_at FROM revisions WHERE resume_id = ? ORDER BY revision",
+            (resume_id,)).fetchall()
+
+    def delete(self, resume_id):
+        """Remove a resume with all its revisions; returns whether it existed"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,)).rowcount
+            conn.execute("DELETE FROM revisions WHERE resume_id = ?", (resume_id,))
+            conn.execute("DELETE FROM skills WHERE resume_id = ?", (resume_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(deleted)
+
+    # Name matching ignores case and extra spaces; every listed skill must be present
+    def search(self, name=None, email=None, skills=(), name_prefix=False, limit=50, offset=0):
+        """Summaries of the latest revisions matching every given filter, newest first"""
+        clauses, params = [], []
+        if email:
+            clauses.append("email = ?")
+            params.append(_email_key(email))
+        if name:
+            key = _name_key(name)
+            if name_prefix:
+                # Range scan on the name index instead of an unindexed LIKE
+                clauses.append("name_key >= ? AND name_key < ?")
+                params += [key, key + "\U0010ffff"]
+            else:
+                clauses.append("name_key = ?")
+                params.append(key)
+        skill_keys = sorted({_skill_key(skill) for skill in skills if _skill_key(skill)})
+        if skill_keys:
+            clauses.append(
+                f"resume_id IN (SELECT resume_id FROM skills WHERE skill IN ({', '.join('?' * len(skill_keys))}) "
+                "GROUP BY resume_id HAVING COUNT(*) = ?)")
+            params += skill_keys + [len(skill_keys)]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM resumes {where} ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]).fetchall()
+        return [_summary(row) for row in rows]
+
+    def find_by_email(self, email):
+        return self.search(email=email, limit=-1)
+
+    def find_by_name(self, name, prefix=False):
+        return self.search(name=name, name_prefix=prefix, limit=-1)
+
+    def find_by_skill(self, skill):
+        return self.search(skills=[skill], limit=-1)
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def iter_latest(self):
+        """Yield (resume_id, data) for every resume, latest revision"""
+        for resume_id, payload in self._connect().execute("SELECT resume_id, data FROM resumes ORDER BY resume_id"):
+            yield resume_id, json.loads(payload)
+
+    def export_jsonl(self, f, all_revisions=False):
+        """Write one JSON object per line (latest revisions, or every revision); returns the count"""
+        conn = self._connect()
+        if all_revisions:
+            rows = conn.execute("SELECT resume_id, revision, created_at, data FROM revisions "
+                                "ORDER BY resume_id, revision")
+        else:
+            rows = conn.execute("SELECT resume_id, revision, updated_at, data FROM resumes ORDER BY resume_id")
+        written = 0
+        for resume_id, revision, saved_at, payload in rows:
+            f.write(f'{{"id":{json.dumps(resume_id)},"revision":{revision},"saved_at":{saved_at},'
+                    f'"data":{payload}}}\n')
+            written += 1
+        return written
+
+    # Imports are run by an operator, so records without an id revise the resume with
+    # the same email (re-importing legacy files does not duplicate them)
+    def import_records(self, records):
+        """Bulk-save (resume_id or None, data) pairs in batched transactions; returns the count"""
+        conn = self._connect()
+        imported = 0
+        batch = []
+
+        def flush():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                for resume_id, data in batch:
+                    if resume_id is None:
+                        resume_id = self._existing_id(conn, _email_key(_personal_info(data)[1])) or uuid.uuid4().hex
+                    self._write(conn, resume_id, data, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        for record in records:
+            batch.append(record)
+            if len(batch) >= _IMPORT_BATCH:
+                flush()
+                imported += len(batch)
+                batch = []
+        if batch:
+            flush()
+            imported += len(batch)
+        return imported
+
+    def import_jsonl(self, f):
+        """Import lines written by export_jsonl, or bare resume objects; returns the count"""
+        def records():
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "data" in record and "personal_info" not in record:
+                    yield record.get("id"), record["data"]
+                else:
+                    yield None, record
+
+        return self.import_records(records())
+
+    def import_legacy_json_dir(self, directory="resumes"):
+        """Import the {full_name}_resume.json files the builder used to write"""
+        def records():
+            for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                if name.endswith(".json"):
+                    with open(os.path.join(directory, name), encoding="utf-8") as f:
+                        yield None, json.load(f)
+
+        return self.import_records(records())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Process-wide store shared by every Streamlit session
+def get_resume_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResumeStore(RESUME_STORE_PATH)
+    return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the Resume Builder store")
+    parser.add_argument("--store", default=RESUME_STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    legacy = commands.add_parser("import-legacy", help="import resumes/*_resume.json files")
+    legacy.add_argument("directory", nargs="?", default="resumes")
+    load = commands.add_parser("import", help="import a JSONL file ('-' for stdin)")
+    load.add_argument("path")
+    dump = commands.add_parser("export", help="export to a JSONL file ('-' for stdout)")
+    dump.add_argument("path")
+    dump.add_argument("--all-revisions", action="store_true")
+    find = commands.add_parser("search")
+    find.add_argument("--name")
+    find.add_argument("--prefix", action="store_true", help="match names by prefix")
+    find.add_argument("--email")
+    find.add_argument("--skill", action="append", default=[])
+    find.add_argument("--limit", type=int, default=50)
+    commands.add_parser("stats")
+    args = parser.parse_args()
+
+    store = ResumeStore(args.store)
+    if args.command == "import-legacy":
+        print(f"Imported {store.import_legacy_json_dir(args.directory)} resumes")
+    elif args.command == "import":
+        if args.path == "-":
+            count = store.import_jsonl(sys.stdin)
+        else:
+            with open(args.path, encoding="utf-8") as f:
+                count = store.import_jsonl(f)
+        print(f"Imported {count} resumes", file=sys.stderr)
+    elif args.command == "export":
+        if args.path == "-":
+            count = store.export_jsonl(sys.stdout, args.all_revisions)
+        else:
+            with open(args.path, "w", encoding="utf-8") as f:
+                count = store.export_jsonl(f, args.all_revisions)
+        print(f"Exported {count} records", file=sys.stderr)
+    elif args.command == "search":
+        for hit in store.search(args.name, args.email, args.skill, args.prefix, args.limit):
+            print(f"{hit['id']}  r{hit['revision']}  {hit['full_name']}  {hit['email']}")
+    elif args.command == "stats":
+        print(json.dumps({"resumes": store.count()}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
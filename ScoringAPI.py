@@ -0,0 +1,366 @@
+import argparse
+import base64
+import email.policy
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+import Telemetry
+
+# HTTP API for other services, next to the Streamlit UI:
+#
+#   GET  /health                  pool size and requests in progress
+#   GET  /metrics                 Prometheus text (Telemetry aggregates)
+#   POST /extract                 resume PDF -> text
+#   POST /score                   resume PDF or text + job description -> ATS, match and skill scores
+#   POST /analyze                 same, plus the Gemini analysis and course suggestions
+#
+# Bodies are multipart/form-data (a "resume" file and "resume_text" / "job_description"
+# fields), application/json with the same keys as strings ("resume" holding the PDF
+# base64-encoded), or a raw application/pdf resume.
+# Extraction and scoring run in a process pool; Gemini calls go through the shared
+# analysis thread pool and scheduler. Bodies over SCORING_API_MAX_BYTES get a 413,
+# and once SCORING_API_MAX_PENDING requests are in progress new ones get a 503. A pool
+# broken by a dying worker is rebuilt and the task retried once.
+#
+#   python ScoringAPI.py --port 8600
+#   curl -F resume=@cv.pdf -F job_description="Python, SQL, AWS" localhost:8600/score
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SCORING_API_HOST = os.getenv("SCORING_API_HOST", "127.0.0.1")
+SCORING_API_PORT = int(os.getenv("SCORING_API_PORT", "8600"))
+SCORING_API_WORKERS = int(os.getenv("SCORING_API_WORKERS", "0"))
+SCORING_API_MAX_BYTES = int(os.getenv("SCORING_API_MAX_BYTES", str(10 * 1024 * 1024)))
+SCORING_API_MAX_PENDING = int(os.getenv("SCORING_API_MAX_PENDING", "64"))
+# Longest a request waits for its extraction or scoring task; a task still running
+# then gets its pool recycled, which also restarts the other tasks in that pool
+SCORING_API_TIMEOUT = float(os.getenv("SCORING_API_TIMEOUT", "60"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# Worker tasks (module level so the spawn pool can import them)
+def _extract_task(data):
+    from PdfExtract import extract_pdf_text
+
+    return extract_pdf_text(data, workers=1)
+
+
+def _score_task(resume_text, job_description):
+    from ResumeAnalyzer import calculate_ats_score, calculate_match_score
+
+    return {
+        "ats_score": calculate_ats_score(resume_text, job_description),
+        "match_score": calculate_match_score(resume_text, job_description, observe=False),
+    }
+
+
+def _ats_task(resume_text, job_description):
+    return _score_task(resume_text, job_description)["ats_score"]
+
+
+def _match_task(resume_text, job_description):
+    return _score_task(resume_text, job_description)["match_score"]
+
+
+def _get_pool(workers=None):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = workers or SCORING_API_WORKERS or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# Stop handing out pool (the next request starts a fresh one). With terminate its
+# workers are killed too, since shutdown() never stops a task that is already running.
+def _discard_pool(pool, terminate=False):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    if terminate:
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_pool(func, *args):
+    """Run func in the worker pool; a slow task is a 504 and a crashing one a 503"""
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            future = pool.submit(func, *args)
+        except RuntimeError:
+            # Broken, or shut down by another request replacing it
+            _discard_pool(pool)
+            continue
+        try:
+            return future.result(timeout=SCORING_API_TIMEOUT)
+        except BrokenProcessPool:
+            # A worker died (killed for memory, or crashed on a hostile PDF) and took
+            # the pool with it; rebuild it and try once more
+            logger.warning("Worker pool broke running %s; restarting it", func.__name__)
+            _discard_pool(pool)
+        except FutureTimeoutError:
+            if not future.cancel():
+                # Still running, possibly stuck on a pathological PDF: free its worker
+                _discard_pool(pool, terminate=True)
+            raise ApiError(504, "Processing timed out")
+    raise ApiError(503, "Worker processes are restarting, retry shortly", headers={"Retry-After": "1"})
+
+
+def parse_multipart(content_type, body):
+    """Return {name: bytes} for the parts of a multipart/form-data body"""
+    message = BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+    if not message.is_multipart():
+        raise ApiError(400, "Malformed multipart body")
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = part.get_payload(decode=True) or b""
+    return fields
+
+
+def _text_field(fields, name):
+    value = fields.get(name)
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    if value is not None and not isinstance(value, str):
+        raise ApiError(400, f"\"{name}\" must be a string")
+    return value or ""
+
+
+# Text of the resume in a request: an uploaded PDF (cached by content) or resume_text
+def resume_text_for(fields):
+    from PdfCache import pdf_text_cache
+
+    data = fields.get("resume")
+    if isinstance(data, bytes) and data:
+        text = pdf_text_cache.get_or_extract(data, lambda pdf: run_in_pool(_extract_task, pdf)[0])
+        if not text:
+            raise ApiError(422, "No text could be extracted from the PDF")
+        return text
+    text = _text_field(fields, "resume_text")
+    if not text:
+        raise ApiError(400, "Send a resume PDF (\"resume\") or \"resume_text\"")
+    return text
+
+
+def handle_extract(fields):
+    data = fields.get("resume")
+    if not isinstance(data, bytes) or not data:
+        raise ApiError(400, "Send a resume PDF as \"resume\"")
+    text, status = run_in_pool(_extract_task, data)
+    if status == "failed":
+        raise ApiError(422, "No text could be extracted from the PDF")
+    return {"text": text, "status": status, "chars": len(text)}
+
+
+def handle_score(fields):
+    resume_text = resume_text_for(fields)
+    job_description = _text_field(fields, "job_description")
+    if not job_description:
+        raise ApiError(400, "\"job_description\" is required")
+    from SkillMatcher import skill_match
+
+    scores = run_in_pool(_score_task, resume_text, job_description)
+    # Skill matching takes well under a millisecond, so it runs on the request thread
+    return {"chars": len(resume_text), **scores, "skills_match": skill_match(resume_text, job_description)}
+
+
+def handle_analyze(fields):
+    from AnalysisPipeline import run_analysis
+
+    resume_text = resume_text_for(fields)
+    job_description = _text_field(fields, "job_description")
+    result = run_analysis(resume_text, job_description,
+                          match=lambda r, j: run_in_pool(_match_task, r, j) if j else None,
+                          ats=lambda r, j: run_in_pool(_ats_task, r, j))
+    return {
+        "chars": len(resume_text),
+        "ats_score": result.ats_score,
+        "match_score": result.match_score,
+        "skills_match": result.skills_match,
+        "analysis": result.analysis,
+        "course_suggestions": result.course_suggestions,
+        "timings": result.timings,
+        "errors": result.errors,
+    }
+
+
+ROUTES = {
+    "/extract": handle_extract,
+    "/score": handle_score,
+    "/analyze": handle_analyze,
+}
+
+
+# Counts requests in progress and refuses new ones past the limit
+class Admission:
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.in_progress = 0
+        self._lock = threading.Lock()
+
+    def try_enter(self):
+        with self._lock:
+            if self.in_progress >= self.limit:
+                return False
+            self.in_progress += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_progress -= 1
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ThirdEyeScoring/1.0"
+    admission = None  # shared by all handlers of one server
+
+    def _send(self, status, payload, content_type="application/json", headers=None):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_fields(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            raise ApiError(411, "Content-Length is required")
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise ApiError(400, "Invalid Content-Length")
+        if length > SCORING_API_MAX_BYTES:
+            # The body is never read, so the connection cannot be reused
+            self.close_connection = True
+            raise ApiError(413, f"Request body is larger than {SCORING_API_MAX_BYTES} bytes")
+        body = self.rfile.read(length)
+        content_type = self.headers.get_content_type()
+        if content_type == "multipart/form-data":
+            return parse_multipart(self.headers["Content-Type"], body)
+        if content_type == "application/json":
+            try:
+                fields = json.loads(body or b"{}")
+            except ValueError:
+                raise ApiError(400, "Malformed JSON body")
+            if not isinstance(fields, dict):
+                raise ApiError(400, "Expected a JSON object")
+            resume = fields.get("resume")
+            if resume is not None:
+                try:
+                    fields["resume"] = base64.b64decode(resume, validate=True)
+                except (TypeError, ValueError):
+                    raise ApiError(400, "\"resume\" must be a base64-encoded PDF")
+            return fields
+        if content_type == "application/pdf":
+            return {"resume": body}
+        raise ApiError(415, "Use multipart/form-data, application/json or application/pdf")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "in_progress": self.admission.in_progress,
+                             "max_pending": self.admission.limit})
+        elif self.path == "/metrics":
+            self._send(200, Telemetry.metrics.prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path)
+        if handler is None:
+            self._send(404, {"error": "Not found"})
+            return
+        # Shed load instead of queueing without bound
+        if not self.admission.try_enter():
+            self.close_connection = True
+            self._send(503, {"error": "Server is busy, retry shortly"}, headers={"Retry-After": "1"})
+            return
+        try:
+            with Telemetry.trace(f"api{self.path.replace('/', '.')}"):
+                fields = self._read_fields()
+                payload = handler(fields)
+            self._send(200, payload)
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)}, headers=e.headers)
+        except Exception as e:
+            logger.exception("Request to %s failed", self.path)
+            self._send(500, {"error": str(e)})
+        finally:
+            self.admission.leave()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host=SCORING_API_HOST, port=SCORING_API_PORT, max_pending=SCORING_API_MAX_PENDING):
+    """Bind the API server (port 0 picks a free port); call serve_forever() to run it"""
+    handler = type("Handler", (ScoringHandler,), {"admission": Admission(max_pending)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve resume extraction, scoring and analysis over HTTP")
+    parser.add_argument("--host", default=SCORING_API_HOST)
+    parser.add_argument("--port", type=int, default=SCORING_API_PORT)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    _get_pool(args.workers or None)
+    server = create_server(args.host, args.port)
+    print(f"Scoring API listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
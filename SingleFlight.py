@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import Future
+
+# Coalesce identical work that is in flight at the same time: the first caller for a
+# key runs it, later callers wait for that result instead of repeating the call.
+# Results are shared through a concurrent.futures.Future, so threads block on it and
+# asyncio code awaits asyncio.wrap_future(future) without holding a thread. Streamed
+# text is relayed to waiting threads as it arrives.
+#
+# Only errors raised by the work itself are shared. When the leader stops for its own
+# reasons (its on_chunk callback failed, or its thread was interrupted, e.g. by a
+# Streamlit rerun) the flight is abandoned and the waiting callers start over.
+
+
+class FlightAbandoned(Exception):
+    """The leading caller stopped before the work produced an answer"""
+
+
+class _Flight:
+    __slots__ = ("future", "condition", "text", "version")
+
+    def __init__(self):
+        self.future = Future()
+        self.condition = threading.Condition()
+        self.text = ""
+        self.version = 0
+
+    def publish(self, text):
+        with self.condition:
+            self.text = text
+            self.version += 1
+            self.condition.notify_all()
+
+    def settle(self, result=None, error=None):
+        with self.condition:
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+            self.condition.notify_all()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.followers += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self.leaders += 1
+            return flight, True
+
+    def _lead(self, key, flight, fn, on_chunk):
+        interrupted = []
+
+        def relay(piece, text):
+            flight.publish(text)
+            try:
+                on_chunk(piece, text)
+            except BaseException:
+                interrupted.append(True)
+                raise
+
+        try:
+            result = fn(relay if on_chunk is not None else None)
+        except BaseException as e:
+            self._land(key, flight, error=e, abandon=bool(interrupted) or not isinstance(e, Exception))
+            raise
+        # A stream cut short by the leader's callback is the leader's partial answer only
+        self._land(key, flight, result, abandon=bool(interrupted))
+        return result
+
+    def _land(self, key, flight, result=None, error=None, abandon=False):
+        # New callers start a fresh flight from here on
+        with self._lock:
+            self._flights.pop(key, None)
+        if abandon:
+            flight.settle(error=FlightAbandoned(key))
+        else:
+            flight.settle(result, error)
+
+    # Wait for the leader, passing its streamed text on to on_chunk
+    @staticmethod
+    def _follow(flight, on_chunk):
+        seen = 0
+        delivered = ""
+        while on_chunk is not None:
+            with flight.condition:
+                while flight.version == seen and not flight.future.done():
+                    flight.condition.wait()
+                text, seen, done = flight.text, flight.version, flight.future.done()
+            if text != delivered and text.startswith(delivered):
+                on_chunk(text[len(delivered):], text)
+                delivered = text
+            if done:
+                break
+        return flight.future.result()
+
+    def do(self, key, fn, on_chunk=None):
+        """Run fn(on_chunk) unless the same key is already running; returns (result, shared)"""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                return self._lead(key, flight, fn, on_chunk), False
+            try:
+                return self._follow(flight, on_chunk), True
+            except FlightAbandoned:
+                # Join the next flight, or lead it
+                continue
+
+    def in_flight(self, key):
+        """The Future of a running call for key, or None; it raises FlightAbandoned if the leader stops"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                return None
+            self.followers += 1
+            return flight.future
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._flights)}
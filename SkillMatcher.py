@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Local skill extraction: every phrase of the skill taxonomy (canonical names and
+# aliases) is compiled into one word-level Aho-Corasick automaton, so a resume or job
+# description is scanned in a single pass however many phrases there are. Aliases map
+# to their canonical skill, and "implies" relations (Django -> Python) give partial
+# credit for skills a resume shows without naming them.
+#
+# The taxonomy is JSON: {"categories": {category: {skill: entry}}} where an entry may
+# have "aliases" (matched case-insensitively), "exact" (phrases that only count with
+# the taxonomy's casing, e.g. "Go" or "R") and "implies" (other canonical skills).
+
+# Load environment variables
+load_dotenv()
+
+SKILLS_TAXONOMY_PATH = os.getenv(
+    "SKILLS_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills_taxonomy.json"))
+# Score of a job skill the resume does not name but implies through a related skill
+SKILL_IMPLIED_CREDIT = float(os.getenv("SKILL_IMPLIED_CREDIT", "0.75"))
+
+# Words keep the characters that matter in skill names (c++, c#, .net, node.js);
+# hyphens, slashes and other punctuation separate words
+_TOKEN_RE = re.compile(r"\.?\w+(?:[.+#]+\w+)*[+#]*")
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def tokenize(text):
+    """Skill-aware words of text, in their original case"""
+    return _TOKEN_RE.findall(text or "")
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy):
+        self.skills = []        # canonical names, indexed by skill id
+        self.categories = []    # category of each skill id
+        self.phrases = []       # (word count, skill id, exact words or None) per phrase
+        self._goto = [{}]       # trie edges per node: lowercased word -> node
+        self._fail = [0]
+        self._outputs = [()]    # phrases ending at each node, including those of its suffixes
+        self._vocabulary = set()
+
+        entries = {}
+        for category, skills in taxonomy["categories"].items():
+            for name, entry in skills.items():
+                entries[name] = entry
+                self.skills.append(name)
+                self.categories.append(category)
+        self._ids = {name: skill for skill, name in enumerate(self.skills)}
+        self._implied = [frozenset(self._ids[name] for name in self._closure(entries, name)) for name in self.skills]
+        for name, entry in entries.items():
+            exact = entry.get("exact", [])
+            for phrase in [name, *entry.get("aliases", [])]:
+                if phrase not in exact:
+                    self._add_phrase(self._ids[name], phrase, False)
+            for phrase in exact:
+                self._add_phrase(self._ids[name], phrase, True)
+        self._link()
+        # One job description is usually matched against many resumes
+        self._job_skills = lru_cache(maxsize=64)(self.extract)
+
+    # Skills implied directly or through a chain (Next.js -> React -> JavaScript)
+    @staticmethod
+    def _closure(entries, name):
+        seen = set()
+        stack = list(entries[name].get("implies", []))
+        while stack:
+            implied = stack.pop()
+            if implied not in seen and implied != name:
+                seen.add(implied)
+                stack.extend(entries[implied].get("implies", []))
+        return seen
+
+    def _add_phrase(self, skill, phrase, exact):
+        words = tokenize(phrase)
+        if not words:
+            return
+        node = 0
+        for word in words:
+            word = word.lower()
+            self._vocabulary.add(word)
+            child = self._goto[node].get(word)
+            if child is None:
+                child = self._goto[node][word] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            node = child
+        phrase = (len(words), skill, tuple(words) if exact else None)
+        self._outputs[node] += (phrase,)
+        self.phrases.append(phrase)
+
+    # Breadth-first failure links; each node also reports the phrases of its suffixes
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] += self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def _scan(self, words):
+        """(start, -end, skill id) of every phrase occurrence, so sorting puts the longest first"""
+        goto, fail, outputs, vocabulary = self._goto, self._fail, self._outputs, self._vocabulary
+        hits = []
+        node = 0
+        for end, word in enumerate(words):
+            word = word.lower()
+            if word not in vocabulary:
+                node = 0
+                continue
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for length, skill, exact in outputs[node]:
+                start = end - length + 1
+                if exact is None or tuple(words[start:end + 1]) == exact:
+                    hits.append((start, -end, skill))
+        return hits
+
+    def extract(self, text):
+        """{skill: mentions} for the skills in text, in order of first mention"""
+        # Keep the leftmost-longest phrases so "Google Analytics" is not also "analytics"
+        counts = {}
+        covered = -1
+        for start, end, skill in sorted(self._scan(tokenize(text))):
+            if start > covered:
+                name = self.skills[skill]
+                counts[name] = counts.get(name, 0) + 1
+                covered = -end
+        return counts
+
+    def implied_by(self, skills):
+        """Canonical skills implied by the given ones"""
+        implied = set()
+        for name in skills:
+            implied |= self._implied[self._ids[name]]
+        return {self.skills[skill] for skill in implied}
+
+    def match(self, resume_text, job_description):
+        """Score each job description skill from 0 to 1 against the resume, most mentioned first"""
+        job_skills = self._job_skills(job_description)
+        if not job_skills:
+            return {}
+        resume_skills = self.extract(resume_text)
+        implied = self.implied_by(resume_skills)
+        scores = {}
+        for name in sorted(job_skills, key=job_skills.get, reverse=True):
+            if name in resume_skills:
+                scores[name] = 1.0
+            elif name in implied:
+                scores[name] = SKILL_IMPLIED_CREDIT
+            else:
+                scores[name] = 0.0
+        return scores
+
+    @classmethod
+    def load(cls, path=SKILLS_TAXONOMY_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+# Process-wide matcher, built from SKILLS_TAXONOMY_PATH on first use
+def get_skill_matcher():
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher.load(SKILLS_TAXONOMY_PATH)
+    return _matcher
+
+
+# Per-skill match scores for the Skill Match tab; empty without a job description
+def skill_match(resume_text, job_description):
+    if not job_description:
+        return {}
+    return get_skill_matcher().match(resume_text, job_description)
@@ -0,0 +1,291 @@
+import atexit
+import contextvars
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Lightweight tracing for the analyze flow and the chatbot. A span records its
+# duration, numeric input sizes (pages, chars, prompt tokens), cache hit/miss and
+# errors; finished spans feed process-wide aggregates that are exported as
+# Prometheus text or JSON, and the spans of one request are grouped into a trace
+# for the per-session debug panel.
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "1").lower() not in ("0", "false", "no")
+TELEMETRY_EXPORT_PATH = os.getenv("TELEMETRY_EXPORT_PATH", "")
+# "prometheus" or "json"; by default .json paths get JSON and anything else Prometheus text
+TELEMETRY_EXPORT_FORMAT = os.getenv("TELEMETRY_EXPORT_FORMAT", "").lower()
+# Serve /metrics (Prometheus) and /metrics.json on this address; port 0 disables the endpoint
+TELEMETRY_METRICS_HOST = os.getenv("TELEMETRY_METRICS_HOST", "127.0.0.1")
+TELEMETRY_METRICS_PORT = int(os.getenv("TELEMETRY_METRICS_PORT", "0"))
+TELEMETRY_DEBUG_PANEL = os.getenv("TELEMETRY_DEBUG_PANEL", "").lower() in ("1", "true", "yes")
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+METRIC_PREFIX = "thirdeye"
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+_current_trace = contextvars.ContextVar("telemetry_trace", default=None)
+
+
+class Span:
+    __slots__ = ("name", "attributes", "parent", "depth", "started", "duration", "error")
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.started = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        """Add attributes, e.g. span.set(chars=1200, cache="hit")"""
+        self.attributes.update(attributes)
+
+    def fail(self, message):
+        """Mark the span failed without raising (for errors turned into display text)"""
+        self.error = str(message)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+            "attributes": dict(self.attributes),
+            "error": self.error,
+        }
+
+
+# Spans finished while a trace is active, in completion order
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: (span.started, span.depth))
+        return {
+            "name": self.name,
+            "started": self.started,
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+            "spans": [span.to_dict() for span in spans],
+        }
+
+
+# Process-wide aggregates per span name
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = defaultdict(int)
+            self.duration_sum = defaultdict(float)
+            self.buckets = defaultdict(lambda: [0] * len(BUCKETS))
+            self.errors = defaultdict(int)
+            self.cache = defaultdict(int)
+            self.sizes = defaultdict(float)
+
+    def record(self, span):
+        with self._lock:
+            name = span.name
+            self.count[name] += 1
+            self.duration_sum[name] += span.duration
+            counts = self.buckets[name]
+            for i, bound in enumerate(BUCKETS):
+                if span.duration <= bound:
+                    counts[i] += 1
+            if span.error is not None:
+                self.errors[name] += 1
+            for key, value in span.attributes.items():
+                if key == "cache":
+                    self.cache[(name, str(value))] += 1
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.sizes[(name, key)] += value
+
+    def snapshot(self):
+        with self._lock:
+            spans = {}
+            for name, count in self.count.items():
+                spans[name] = {
+                    "count": count,
+                    "duration_seconds_sum": round(self.duration_sum[name], 6),
+                    "duration_seconds_buckets": dict(zip(map(str, BUCKETS), self.buckets[name])),
+                    "errors": self.errors.get(name, 0),
+                    "cache": {result: n for (span, result), n in self.cache.items() if span == name},
+                    "sizes": {key: value for (span, key), value in self.sizes.items() if span == name},
+                }
+            return {"generated_at": time.time(), "spans": spans}
+
+    def prometheus(self):
+        """Render the aggregates in the Prometheus text exposition format"""
+        snapshot = self.snapshot()["spans"]
+        duration = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines = [f"# HELP {duration} Duration of traced stages.", f"# TYPE {duration} histogram"]
+        for name, data in sorted(snapshot.items()):
+            label = _label(name)
+            for bound, count in data["duration_seconds_buckets"].items():
+                lines.append(f'{duration}_bucket{{span="{label}",le="{bound}"}} {count}')
+            lines.append(f'{duration}_bucket{{span="{label}",le="+Inf"}} {data["count"]}')
+            lines.append(f'{duration}_sum{{span="{label}"}} {data["duration_seconds_sum"]}')
+            lines.append(f'{duration}_count{{span="{label}"}} {data["count"]}')
+
+        errors = f"{METRIC_PREFIX}_span_errors_total"
+        lines += [f"# HELP {errors} Traced stages that failed.", f"# TYPE {errors} counter"]
+        for name, data in sorted(snapshot.items()):
+            lines.append(f'{errors}{{span="{_label(name)}"}} {data["errors"]}')
+
+        cache = f"{METRIC_PREFIX}_span_cache_total"
+        lines += [f"# HELP {cache} Cache lookups by traced stage and result.", f"# TYPE {cache} counter"]
+        for name, data in sorted(snapshot.items()):
+            for result, count in sorted(data["cache"].items()):
+                lines.append(f'{cache}{{span="{_label(name)}",result="{_label(result)}"}} {count}')
+
+        sizes = f"{METRIC_PREFIX}_span_input_total"
+        lines += [f"# HELP {sizes} Summed input sizes (pages, chars, tokens) by traced stage.",
+                  f"# TYPE {sizes} counter"]
+        for name, data in sorted(snapshot.items()):
+            for key, value in sorted(data["sizes"].items()):
+                lines.append(f'{sizes}{{span="{_label(name)}",measure="{_label(key)}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+metrics = MetricsRegistry()
+
+
+# Time a block as a span nested under the current one. Exceptions are recorded
+# and re-raised; use span.fail() for errors the block handles itself.
+@contextmanager
+def span(name, **attributes):
+    if not TELEMETRY_ENABLED:
+        yield Span(name, attributes, None)
+        return
+    parent = _current_span.get()
+    record = Span(name, attributes, parent)
+    token = _current_span.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        metrics.record(record)
+        trace_ = _current_trace.get()
+        if trace_ is not None:
+            trace_.add(record)
+
+
+# Add attributes to the innermost active span, if any
+def annotate(**attributes):
+    record = _current_span.get()
+    if record is not None:
+        record.set(**attributes)
+
+
+# Group the spans of one request; the metrics file is refreshed when it ends
+@contextmanager
+def trace(name):
+    record = Trace(name)
+    token = _current_trace.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration = time.perf_counter() - start
+        _current_trace.reset(token)
+        export()
+
+
+# Write the aggregates to TELEMETRY_EXPORT_PATH atomically
+def export(path=None, fmt=None):
+    path = path or TELEMETRY_EXPORT_PATH
+    if not path or not TELEMETRY_ENABLED:
+        return
+    fmt = fmt or TELEMETRY_EXPORT_FORMAT or ("json" if path.endswith(".json") else "prometheus")
+    body = json.dumps(metrics.snapshot(), indent=2) if fmt == "json" else metrics.prometheus()
+    try:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write metrics to %s: %s", path, e)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+# Serve the aggregates over HTTP from a daemon thread; safe to call on every rerun
+def start_metrics_server(port=None, host=None):
+    global _server
+    port = TELEMETRY_METRICS_PORT if port is None else port
+    host = host or TELEMETRY_METRICS_HOST
+    if not port or not TELEMETRY_ENABLED:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                elif self.path.startswith("/metrics"):
+                    body, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            logger.warning("Metrics endpoint not started on %s:%s: %s", host, port, e)
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
+
+
+# Only the main process exports at exit: spawned pool workers import this module too,
+# and their nearly empty aggregates would overwrite the parent's file
+if multiprocessing.parent_process() is None:
+    atexit.register(export)
@@ -0,0 +1,104 @@
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# Shared tokenization for every local scorer. Each text is lowercased and tokenized
+# once; counts, sets, n-grams and the stopword-filtered view are derived from those
+# tokens on first use and cached on the document.
+TEXT_PIPELINE_CACHE_SIZE = 256
+
+# The word pattern calculate_ats_score has always used. Tokens of two or more
+# characters are exactly what TfidfVectorizer's default \b\w\w+\b pattern yields.
+_WORD_RE = re.compile(r"\b\w+\b")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each etc few for
+from further had has have having he her here hers herself him himself his how i if in into
+is it its itself just me more most my myself no nor not now of off on once only or other
+our ours ourselves out over own per same she should so some such than that the their theirs
+them themselves then there these they this those through to too under until up us very via
+was we were what when where which while who whom why will with within without would you
+your yours yourself yourselves
+""".split())
+
+
+class Document:
+    __slots__ = ("text", "tokens", "_cache")
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.tokens = _WORD_RE.findall(self.text.lower())
+        self._cache = {}
+
+    def _derive(self, name, build):
+        value = self._cache.get(name)
+        if value is None:
+            value = build()
+            self._cache[name] = value
+        return value
+
+    @property
+    def counts(self):
+        """Counts of every \\w+ token"""
+        return self._derive("counts", lambda: Counter(self.tokens))
+
+    @property
+    def word_set(self):
+        """Unique \\w+ tokens, as calculate_ats_score compares them"""
+        return self._derive("word_set", lambda: frozenset(self.counts))
+
+    @property
+    def term_counts(self):
+        """Counts of tokens with two or more characters (the TF-IDF/BM25 terms)"""
+        return self._derive("term_counts", lambda: Counter({t: n for t, n in self.counts.items() if len(t) > 1}))
+
+    @property
+    def length(self):
+        """Number of TF-IDF/BM25 terms in the document"""
+        return self._derive("length", lambda: sum(self.term_counts.values()))
+
+    @property
+    def content_tokens(self):
+        """Tokens without stopwords and single characters, in document order"""
+        return self._derive("content_tokens", lambda: [t for t in self.tokens if len(t) > 1 and t not in STOPWORDS])
+
+    @property
+    def content_counts(self):
+        return self._derive("content_counts", lambda: Counter(self.content_tokens))
+
+    @property
+    def bigrams(self):
+        """Counts of adjacent content-token pairs, joined with a space"""
+        def build():
+            tokens = self.content_tokens
+            return Counter(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return self._derive("bigrams", build)
+
+
+# Rough Gemini token count for prompt sizing: about four characters per token
+def estimate_tokens(text):
+    return (len(text) + 3) // 4 if text else 0
+
+
+_documents = OrderedDict()
+_lock = threading.Lock()
+
+
+# Return the shared representation of text, tokenizing it at most once while cached.
+# Bulk indexing passes cache=False so it does not flush interactive documents.
+def analyze_text(text, cache=True):
+    text = text or ""
+    if not cache:
+        return Document(text)
+    with _lock:
+        document = _documents.get(text)
+        if document is not None:
+            _documents.move_to_end(text)
+            return document
+    document = Document(text)
+    with _lock:
+        _documents[text] = document
+        while len(_documents) > TEXT_PIPELINE_CACHE_SIZE:
+            _documents.popitem(last=False)
+    return document
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ResumeExport import FORMATS, export_bulk  # noqa: E402
+from ResumeStore import ResumeStore  # noqa: E402
+
+# Bulk DOCX/PDF export throughput (resumes per second) from a synthetic resume store.
+#
+#   python benchmarks/bench_export.py --resumes 5000 --workers 1 4 --output export_bench.json
+
+WORDS = ("built led designed improved scaled migrated automated delivered python sql aws docker "
+         "kubernetes react api platform pipeline latency customers team reliability").split()
+
+
+def make_resume(rng, i):
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    return {
+        "personal_info": {"full_name": f"Candidate {i}", "email": f"candidate{i}@example.com",
+                          "phone": "555-0100", "location": "Remote", "linkedin": "", "portfolio": ""},
+        "professional_summary": sentence(40),
+        "work_experience": [{"company": f"Company {j}", "position": "Engineer", "start_date": "2019",
+                             "end_date": "2023", "responsibilities": "\n".join(f"- {sentence(15)}" for _ in range(4))}
+                            for j in range(3)],
+        "education": [{"institution": "State University", "degree": "BSc", "graduation_year": "2018", "gpa": "3.6"}],
+        "skills": rng.sample(WORDS, 8),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk resume export")
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--format", action="append", choices=FORMATS)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    store = ResumeStore(os.path.join(directory, "bench_store.sqlite3"))
+    rng = random.Random(42)
+    store.import_records((None, make_resume(rng, i)) for i in range(args.resumes))
+
+    results = {}
+    for workers in args.workers:
+        zip_path = os.path.join(directory, f"export_{workers}.zip")
+        stats = export_bulk(store.iter_latest(), zip_path, args.format or FORMATS, workers)
+        stats["zip_mb"] = round(os.path.getsize(zip_path) / 1e6, 2)
+        results[f"workers_{workers}"] = stats
+        print(f"{workers:3d} workers: {stats['resumes_per_second']:9.1f} resumes/s "
+              f"({stats['files']} files, {stats['seconds']} s, {stats['zip_mb']} MB)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
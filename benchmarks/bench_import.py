@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Cold import cost of the analysis library versus the dependency set Home.py used
+# to import eagerly. Each sample runs in a fresh interpreter.
+#
+#   python benchmarks/bench_import.py --runs 10 --output import_times.json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "ResumeAnalyzer (lazy library)": "import ResumeAnalyzer",
+    "Home (page module, UI not run)": "import Home",
+    "legacy eager dependencies": (
+        "import streamlit, google.generativeai, pdfplumber, PyPDF2, "
+        "sklearn.feature_extraction.text, sklearn.metrics.pairwise, matplotlib.pyplot"
+    ),
+    "first calculate_match_score call": (
+        "import ResumeAnalyzer; ResumeAnalyzer.calculate_match_score('python developer', 'python')"
+    ),
+}
+
+TIMER = (
+    "import time; _t = time.perf_counter(); {stmt}; "
+    "print(time.perf_counter() - _t)"
+)
+
+
+def time_statement(stmt, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(stmt=stmt)],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            return {"error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"}
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the analyzer modules")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {name: time_statement(stmt, args.runs) for name, stmt in CASES.items()}
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:40s} error: {result['error']}")
+        else:
+            print(f"{name:40s} median {result['median_ms']:9.2f} ms  (min {result['min_ms']}, max {result['max_ms']})")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ResumeIndex import ResumeIndex  # noqa: E402
+
+# BM25 top-k query latency over a synthetic resume corpus with a Zipf-like vocabulary.
+#
+#   python benchmarks/bench_index.py --docs 100000 --queries 50 --output index_bench.json
+
+
+def make_vocabulary(size):
+    return [f"term{i}" for i in range(size)]
+
+
+def make_document(rng, vocabulary, cum_weights, words):
+    return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 top-k retrieval")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--doc-words", type=int, default=350)
+    parser.add_argument("--query-words", type=int, default=250)
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--index", help="index path (default: a temporary file)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(args.vocabulary)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(args.vocabulary)))
+    path = args.index or os.path.join(tempfile.mkdtemp(), "bench_index.sqlite3")
+    index = ResumeIndex(path)
+
+    start = time.perf_counter()
+    batch = []
+    for doc in range(args.docs):
+        batch.append((f"resume-{doc}", make_document(rng, vocabulary, cum_weights, args.doc_words)))
+        if len(batch) == 5000:
+            index.add_documents(batch)
+            batch = []
+    if batch:
+        index.add_documents(batch)
+    build_seconds = time.perf_counter() - start
+
+    queries = [make_document(rng, vocabulary, cum_weights, args.query_words) for _ in range(args.queries)]
+    index.search(queries[0], args.k)  # load per-document arrays
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Same queries again, with posting lists already decoded
+    warm = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        warm.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    warm.sort()
+    results = {
+        "documents": args.docs,
+        "build_seconds": round(build_seconds, 2),
+        "docs_per_second": round(args.docs / build_seconds, 1),
+        "cold_p50_ms": round(statistics.median(latencies), 2),
+        "cold_p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2),
+        "warm_p50_ms": round(statistics.median(warm), 2),
+        "warm_p99_ms": round(warm[min(len(warm) - 1, int(len(warm) * 0.99))], 2),
+        "stats": index.stats(),
+    }
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Responses must come from the fake model every run, not the on-disk LLM cache
+os.environ.setdefault("LLM_CACHE_BYPASS", "1")
+
+import GeminiClient  # noqa: E402
+from AnalysisPipeline import run_analysis  # noqa: E402
+from FakeGemini import FakeModel  # noqa: E402
+from AtsGauge import ats_gauge_svg  # noqa: E402
+from MiniPdf import build_pdf, paginate  # noqa: E402
+from SkillMatcher import skill_match  # noqa: E402
+from ResumeAnalyzer import (  # noqa: E402
+    extract_text_from_pdf, calculate_ats_score, calculate_match_score, plot_ats_score,
+)
+
+# Hot-path benchmarks over a synthetic corpus: PDF extraction, the local scorers, the
+# ATS gauge and the full analyze flow against FakeGemini. Every sample uses a fresh
+# document so the in-process caches do not hide the real cost.
+#
+#   python benchmarks/bench_suite.py --runs 20 --output bench.json
+#   python benchmarks/bench_suite.py --only scoring --compare bench.json
+
+SKILLS = (
+    "python java javascript typescript sql postgresql docker kubernetes aws azure gcp react "
+    "django flask fastapi pandas numpy spark kafka airflow terraform linux git ci cd agile "
+    "scrum leadership communication testing microservices rest graphql redis mongodb"
+).split()
+FILLER = (
+    "designed built delivered improved led managed team project system platform service "
+    "customers data pipeline performance reliability latency cost reduced increased by "
+    "percent across multiple production environments with stakeholders"
+).split()
+
+LINES_PER_PAGE = 50
+WORDS_PER_LINE = 12
+
+
+def make_text(rng, words):
+    vocabulary = SKILLS + FILLER
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def make_resume_pdf(rng, pages):
+    lines = [("Synthetic Candidate", 16, True)]
+    for _ in range(pages * LINES_PER_PAGE - 2):
+        lines.append(make_text(rng, WORDS_PER_LINE))
+    return build_pdf(paginate(lines))
+
+
+def _rss_mb(pid="self"):
+    """Current resident set size of a process from /proc, or None where there is none"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Peak resident memory of this process and of its worker processes (summed) while one
+# case runs, sampled in a background thread. ru_maxrss only has the high-water mark of
+# the whole run, so it is the fallback where /proc is missing and reported as such.
+class RssSampler:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.start = _rss_mb() or 0.0
+        self.peak = 0.0
+        self.children_peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        own = _rss_mb()
+        if own is None:
+            return
+        self.peak = max(self.peak, own)
+        try:
+            children = multiprocessing.active_children()
+        except RuntimeError:
+            return  # a worker was being started; the next sample sees it
+        self.children_peak = max(self.children_peak, sum(filter(None, (_rss_mb(p.pid) for p in children))))
+
+    def result(self):
+        if _rss_mb() is not None:
+            return {"peak_rss_mb": round(self.peak, 1), "rss_growth_mb": round(self.peak - self.start, 1),
+                    "children_peak_rss_mb": round(self.children_peak, 1), "rss_scope": "case"}
+        scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+        return {
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+            "children_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+            "rss_scope": "suite-cumulative",
+        }
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+# Time func(item) for each item; units is the work per call (pages, words, ...)
+def measure(func, items, units=1):
+    samples = []
+    with RssSampler() as rss:
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3),
+        "throughput_per_s": round(len(samples) * units / total, 2) if total else None,
+        "throughput_unit": "calls" if units == 1 else "units",
+        **rss.result(),
+    }
+
+
+def bench_extraction(args, rng):
+    results = {}
+    for pages in args.pages:
+        pdfs = [make_resume_pdf(rng, pages) for _ in range(args.runs)]
+        extract_text_from_pdf(pdfs[0])  # warm up imports and the worker pool
+        result = measure(extract_text_from_pdf, pdfs, units=pages)
+        result["throughput_unit"] = "pages"
+        results[f"extract_{pages}_pages"] = result
+    return results
+
+
+def bench_scoring(args, rng):
+    results = {}
+    job_description = make_text(rng, 300)
+    calculate_match_score(make_text(rng, 50), job_description)  # import scikit-learn
+    skill_match(make_text(rng, 50), job_description)  # build the skill automaton
+    for words in args.words:
+        resumes = [make_text(rng, words) for _ in range(args.runs)]
+        for name, scorer in (("ats", calculate_ats_score), ("match", calculate_match_score), ("skills", skill_match)):
+            result = measure(lambda text: scorer(text, job_description), resumes, units=words)
+            result["throughput_unit"] = "words"
+            results[f"{name}_{words}_words"] = result
+    return results
+
+
+def bench_plot(args, rng):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    def render(score):
+        plt.close(plot_ats_score(score))
+
+    render(50.0)
+    scores = [round(rng.uniform(0, 100), 2) for _ in range(args.runs)]
+    return {"plot_ats_score": measure(render, scores), "ats_gauge_svg": measure(ats_gauge_svg, scores)}
+
+
+def bench_end_to_end(args, rng):
+    previous = GeminiClient.set_model_factory(
+        lambda name: FakeModel(model_name=name, latency=args.llm_latency, chunk_delay=args.chunk_delay))
+    GeminiClient.reset()
+    try:
+        job_description = make_text(rng, 300)
+
+        def analyze(pdf):
+            text = extract_text_from_pdf(pdf)
+            result = run_analysis(text, job_description, on_chunk=lambda stage, partial: None)
+            if result.errors:
+                raise RuntimeError(f"analysis failed: {result.errors}")
+
+        pdfs = [make_resume_pdf(rng, args.e2e_pages) for _ in range(args.runs)]
+        result = measure(analyze, pdfs)
+        result["llm_latency_s"] = args.llm_latency
+        return {"analyze_end_to_end": result}
+    finally:
+        GeminiClient.set_model_factory(previous)
+        GeminiClient.reset()
+
+
+SECTIONS = {
+    "extraction": bench_extraction,
+    "scoring": bench_scoring,
+    "plot": bench_plot,
+    "e2e": bench_end_to_end,
+}
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f).get("results", {})
+    print(f"\nChange in p50 versus {baseline_path}:")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("p50_ms"):
+            continue
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        print(f"  {name:28s} {before['p50_ms']:10.3f} -> {result['p50_ms']:10.3f} ms  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, scoring, plotting and the analyze flow")
+    parser.add_argument("--only", action="append", choices=sorted(SECTIONS), help="run only these sections")
+    parser.add_argument("--runs", type=int, default=10, help="samples per case")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--words", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--e2e-pages", type=int, default=2)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake Gemini latency per call, seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="fake Gemini delay per streamed chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name in args.only or list(SECTIONS):
+        results.update(SECTIONS[name](args, rng))
+
+    for name, result in results.items():
+        print(f"{name:28s} p50 {result['p50_ms']:10.3f} ms  p99 {result['p99_ms']:10.3f} ms  "
+              f"{result['throughput_per_s']} {result['throughput_unit']}/s  rss {result['peak_rss_mb']} MB")
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "arguments": vars(args),
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
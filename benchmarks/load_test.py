@@ -0,0 +1,152 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Responses must come from the fake model every run, not the on-disk LLM cache
+os.environ.setdefault("LLM_CACHE_BYPASS", "1")
+os.environ.setdefault("GEMINI_BACKEND", "fake")
+
+from bench_suite import make_resume_pdf, make_text  # noqa: E402
+
+# Load test for ScoringAPI: concurrent keep-alive clients upload resume PDFs for a fixed
+# duration and the script reports requests per second, latency percentiles and status
+# codes (503s show the backpressure kicking in). Without --url an API server is started
+# in this process with the fake Gemini backend.
+#
+#   python benchmarks/load_test.py --endpoint score --concurrency 16 --duration 20
+#   python benchmarks/load_test.py --url http://127.0.0.1:8600 --endpoint analyze --output load.json
+
+
+def multipart_body(fields):
+    """Encode {name: str | (filename, bytes)} as multipart/form-data; returns (content_type, body)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        if isinstance(value, tuple):
+            filename, data = value
+            header = (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                      "Content-Type: application/pdf\r\n\r\n")
+        else:
+            header = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            data = value.encode("utf-8")
+        parts.append(header.encode("utf-8") + data + b"\r\n")
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode("utf-8")
+    return f"multipart/form-data; boundary={boundary}", body
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def client(url, path, bodies, deadline, results, lock):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+    latencies = []
+    statuses = Counter()
+    i = 0
+    while time.perf_counter() < deadline:
+        content_type, body = bodies[i % len(bodies)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            connection.request("POST", path, body, {"Content-Type": content_type})
+            response = connection.getresponse()
+            response.read()
+            statuses[response.status] += 1
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            statuses["error"] += 1
+            connection.close()
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["statuses"].update(statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the scoring API")
+    parser.add_argument("--url", help="API base URL (default: start a local server)")
+    parser.add_argument("--endpoint", default="score", choices=["extract", "score", "analyze"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--pages", type=int, default=1, help="pages per resume PDF")
+    parser.add_argument("--distinct", type=int, default=50,
+                        help="different PDFs to cycle through (repeats hit the extraction cache)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes for the local server")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        import ScoringAPI
+
+        ScoringAPI._get_pool(args.workers or None)
+        server = ScoringAPI.create_server("127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rng = random.Random(7)
+    job_description = make_text(rng, 120)
+    bodies = [multipart_body({"resume": (f"resume_{i}.pdf", make_resume_pdf(rng, args.pages)),
+                              "job_description": job_description})
+              for i in range(max(1, args.distinct))]
+
+    # Warm up for half a second so worker start-up is not counted
+    warm_up = {"latencies": [], "statuses": Counter()}
+    client(url, f"/{args.endpoint}", bodies[:1], time.perf_counter() + 0.5, warm_up, threading.Lock())
+
+    results = {"latencies": [], "statuses": Counter()}
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=client, args=(url, f"/{args.endpoint}", bodies[i::args.concurrency] or bodies,
+                                                     deadline, results, lock))
+               for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(results["latencies"])
+    ok = results["statuses"].get(200, 0)
+    report = {
+        "endpoint": args.endpoint,
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "ok_per_second": round(ok / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+        },
+        "statuses": {str(status): count for status, count in sorted(results["statuses"].items(), key=str)},
+    }
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()